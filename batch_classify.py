@@ -0,0 +1,81 @@
+import os
+import re
+from concurrency import ordered_map
+
+# 批量判定开关及每个批次的字节预算、条目上限
+BATCH_MODE = os.environ.get('TALENT_BATCH_CLASSIFY', '0') == '1'
+BATCH_BYTES = int(os.environ.get('TALENT_BATCH_BYTES', 24000))
+BATCH_MAX_ITEMS = int(os.environ.get('TALENT_BATCH_MAX_ITEMS', 10))
+
+verdict_pattern = re.compile(r'^\[?(\d+)\]?\s*[:：.、)]?\s*"?(True|False)"?[,，。]?$')
+
+
+def item_bytes(item):
+    return len(str(item).encode('utf-8'))
+
+
+def split_batches(items, budget=None, max_items=None):
+    """按正文长度切分批次，返回每个批次的下标列表"""
+    budget = budget or BATCH_BYTES
+    max_items = max_items or BATCH_MAX_ITEMS
+    batches, current, size = [], [], 0
+    for index, item in enumerate(items):
+        length = item_bytes(item)
+        if current and (size + length > budget or len(current) >= max_items):
+            batches.append(current)
+            current, size = [], 0
+        current.append(index)
+        size += length
+    if current:
+        batches.append(current)
+    return batches
+
+
+def format_items(items):
+    return '\n'.join(f'[{index}] item={item}' for index, item in enumerate(items, 1))
+
+
+def parse_verdicts(text, n):
+    """严格解析每行 '序号: True/False'，缺失、越界或前后矛盾的序号记为 None"""
+    verdicts = [None] * n
+    if not text:
+        return verdicts
+    seen = {}
+    for line in text.splitlines():
+        match = verdict_pattern.match(line.strip())
+        if not match:
+            continue
+        index = int(match.group(1)) - 1
+        if not 0 <= index < n:
+            continue
+        value = match.group(2)
+        if index in seen and seen[index] != value:
+            seen[index] = None
+        elif index not in seen:
+            seen[index] = value
+    for index, value in seen.items():
+        verdicts[index] = value
+    return verdicts
+
+
+def classify_batched(items, batch_func, single_func, budget=None, max_items=None, max_workers=None):
+    """批量判定 items，返回与 items 等长的 'True'/'False' 列表，解析失败的条目逐条重试"""
+    items = list(items)
+    batches = split_batches(items, budget, max_items)
+
+    def run(indices):
+        batch = [items[i] for i in indices]
+        if len(batch) == 1:
+            return [single_func(batch[0])]
+        return parse_verdicts(batch_func(batch), len(batch))
+
+    results = [None] * len(items)
+    for indices, verdicts in zip(batches, ordered_map(run, batches, max_workers)):
+        for index, verdict in zip(indices, verdicts):
+            results[index] = verdict
+
+    missing = [index for index, verdict in enumerate(results) if verdict is None]
+    retried = ordered_map(lambda index: single_func(items[index]), missing, max_workers)
+    for index, verdict in zip(missing, retried):
+        results[index] = verdict
+    return results
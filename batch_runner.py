@@ -0,0 +1,132 @@
+import os
+import re
+import csv
+import json
+import time
+import argparse
+import logging
+from concurrent.futures import as_completed, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from tqdm import tqdm
+from get_talent_doc import get_paper_doc, get_doc
+
+# 批量处理 paper_dataset_demo.csv 格式的作者列表，结果逐行写入 JSONL，支持断点续跑
+logger = logging.getLogger(__name__)
+
+cjk_pattern = re.compile(r'[一-龥]')
+
+
+def row_to_doc(row):
+    email = (row.get('email_addr') or '').strip()
+    return {
+        'name': (row.get('name') or '').strip(),
+        'email': [email] if email else [],
+        'workplace': (row.get('affiliation') or '').strip(),
+    }
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        for index, row in enumerate(csv.DictReader(f)):
+            yield index, row
+
+
+def load_checkpoint(output_path, retry_failed=False):
+    """读取已有输出，返回已完成的行号"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 崩溃时写了一半的行
+            if retry_failed and record.get('status') == 'error':
+                continue
+            done.add(record['row'])
+    return done
+
+
+def process_row(index, row, mode='auto'):
+    doc = row_to_doc(row)
+    started = time.time()
+    try:
+        if mode == 'doc' or (mode == 'auto' and cjk_pattern.search(doc['name'])):
+            updated_doc, candidates = get_doc(doc)
+        else:
+            updated_doc, candidates = get_paper_doc(doc)
+        status = 'ok' if updated_doc is not None else 'not_found'
+        error = None
+    except Exception as e:
+        updated_doc, candidates, status, error = None, [], 'error', f'{type(e).__name__}: {e}'
+    return {
+        'row': index,
+        'email': row.get('email_addr'),
+        'name': row.get('name'),
+        'status': status,
+        'doc': updated_doc,
+        'candidates': candidates,
+        'error': error,
+        'elapsed': round(time.time() - started, 3),
+    }
+
+
+def run(input_path, output_path, workers=4, mode='auto', limit=None, retry_failed=False):
+    done = load_checkpoint(output_path, retry_failed)
+    stats = {'ok': 0, 'not_found': 0, 'error': 0, 'skipped': len(done)}
+    max_pending = workers * 4
+    started = time.time()
+
+    with open(output_path, 'a', encoding='utf-8') as out, \
+            ProcessPoolExecutor(max_workers=workers) as executor, \
+            tqdm(desc='rows', unit='row') as bar:
+
+        def write(record):
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            os.fsync(out.fileno())
+            stats[record['status']] += 1
+            processed = stats['ok'] + stats['not_found'] + stats['error']
+            bar.update(1)
+            bar.set_postfix(rate=f'{processed / max(time.time() - started, 1e-6):.2f}/s',
+                            failed=stats['error'], not_found=stats['not_found'])
+
+        # 按需提交，避免一次性把十万行读进内存
+        pending = set()
+        submitted = 0
+        for index, row in read_rows(input_path):
+            if index in done:
+                continue
+            if limit is not None and submitted >= limit:
+                break
+            pending.add(executor.submit(process_row, index, row, mode))
+            submitted += 1
+            if len(pending) >= max_pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    write(future.result())
+        for future in as_completed(pending):
+            write(future.result())
+
+    stats['elapsed'] = round(time.time() - started, 3)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量获取作者的学者信息')
+    parser.add_argument('input', help='CSV 文件，列为 email_addr,name,affiliation,...')
+    parser.add_argument('output', help='JSONL 输出文件，已存在时从断点继续')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--mode', choices=['auto', 'paper', 'doc'], default='auto',
+                        help='paper 调用 get_paper_doc，doc 调用 get_doc，auto 按姓名是否为中文选择')
+    parser.add_argument('--limit', type=int, default=None, help='本次最多处理的行数')
+    parser.add_argument('--retry-failed', action='store_true', help='重新处理上次出错的行')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stats = run(args.input, args.output, args.workers, args.mode, args.limit, args.retry_failed)
+    logger.info('batch finished: %s', json.dumps(stats))
+
+
+if __name__ == '__main__':
+    main()
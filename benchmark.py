@@ -0,0 +1,150 @@
+import os
+import csv
+import json
+import time
+import argparse
+import logging
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import transport
+import cache
+import cascade
+import profile_store
+from metrics import render_prometheus
+from gazetteer import Gazetteer, set_gazetteer
+from name_index import NameIndex, set_name_index
+from standin_server import StandinConfig, start_server, parse_latency, load_fixtures
+
+# 离线基准测试：在替身服务上跑 get_paper_doc / get_doc / main_compare，
+# 报告每秒行数、单文档延迟分位数和每文档调用次数，结果可保存下来在提交之间对比
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def read_docs(path, limit=None):
+    from batch_runner import row_to_doc
+    docs = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            docs.append(row_to_doc(row))
+            if limit is not None and len(docs) >= limit:
+                break
+    return docs
+
+
+def run_scenario(name, func, inputs, workers, server):
+    server.config.requests.clear()
+    latencies, errors = [], 0
+
+    def timed(item):
+        started = time.perf_counter()
+        try:
+            func(item)
+            return time.perf_counter() - started, None
+        except Exception as e:
+            return time.perf_counter() - started, f'{type(e).__name__}: {e}'
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for latency, error in executor.map(timed, inputs):
+            latencies.append(latency)
+            if error is not None:
+                errors += 1
+                logger.debug('%s failed: %s', name, error)
+    elapsed = time.perf_counter() - started
+    calls = dict(server.config.requests)
+    return {
+        'scenario': name,
+        'documents': len(inputs),
+        'errors': errors,
+        'elapsed': round(elapsed, 3),
+        'rows_per_second': round(len(inputs) / elapsed, 3) if elapsed else None,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'calls_per_document': round(sum(calls.values()) / max(len(inputs), 1), 2),
+        'calls_by_endpoint': calls,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线基准测试')
+    parser.add_argument('--input', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                        'paper_dataset_demo.csv'))
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--scenarios', default='get_paper_doc,get_doc,main_compare')
+    parser.add_argument('--latency', default='search=0.3,gpt=0.8,chat=0.5,hyaide=1.5')
+    parser.add_argument('--jitter', type=float, default=0.2)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--fixtures', default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--confidence', type=int, default=90, help='替身快模型报告的置信度')
+    parser.add_argument('--use-cache', action='store_true', help='默认绕过持久化缓存和档案库，避免重复运行互相影响')
+    parser.add_argument('--output', default=None, help='把结果写入 JSON 文件')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    config = StandinConfig(parse_latency(args.latency), args.jitter, args.error_rate,
+                           load_fixtures(args.fixtures) if args.fixtures else None, seed=args.seed,
+                           confidence=args.confidence)
+    server, base_url = start_server(config)
+    transport.configure(base_url=base_url)
+    workdir = tempfile.mkdtemp(prefix='talent_bench_')
+    if not args.use_cache:
+        cache.set_cache(cache.ResponseCache(os.path.join(workdir, 'cache.sqlite3'), mode='bypass'))
+        profile_store.set_profile_store(profile_store.ProfileStore(os.path.join(workdir, 'profiles.sqlite3'),
+                                                                   mode='bypass'))
+
+    # 本地词典写回放到临时目录，避免污染工作目录
+    set_gazetteer(Gazetteer(path=os.path.join(workdir, 'gazetteer.json')))
+    set_name_index(NameIndex(path=os.path.join(workdir, 'name_index.json')))
+
+    from get_talent_doc import get_paper_doc, get_doc
+    from compare_test import main_compare
+
+    docs = read_docs(args.input, args.limit)
+    scenarios = {
+        'get_paper_doc': (lambda doc: get_paper_doc(dict(doc)), docs),
+        'get_doc': (lambda doc: get_doc(dict(doc)), docs),
+        'main_compare': (lambda pair: main_compare(*pair),
+                         [(json.dumps(a, ensure_ascii=False), json.dumps(b, ensure_ascii=False))
+                          for a, b in zip(docs[::2], docs[1::2])]),
+    }
+    results = []
+    for name in args.scenarios.split(','):
+        func, inputs = scenarios[name.strip()]
+        result = run_scenario(name.strip(), func, inputs, args.workers, server)
+        logger.info('%s', json.dumps(result, ensure_ascii=False))
+        results.append(result)
+    server.shutdown()
+
+    report = {'revision': git_revision(), 'args': vars(args), 'results': results,
+              'cascade': cascade.task_stats(), 'metrics': render_prometheus()}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    for result in results:
+        print(f"{result['scenario']:>14}: {result['rows_per_second']} rows/s, "
+              f"p50={result['p50']:.3f}s p95={result['p95']:.3f}s p99={result['p99']:.3f}s, "
+              f"{result['calls_per_document']} calls/doc, {result['errors']} errors")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from transport import post_json
+import singleflight
+from metrics import register_callback
+
+# 缓存模式：readwrite 读写，readonly 只读不写，bypass 完全绕过
+CACHE_PATH = os.environ.get('TALENT_CACHE_PATH', 'talent_cache.sqlite3')
+CACHE_MODE = os.environ.get('TALENT_CACHE_MODE', 'readwrite')
+CACHE_MAX_ENTRIES = int(os.environ.get('TALENT_CACHE_MAX_ENTRIES', 200000))
+
+DAY = 24 * 3600
+# 各类请求的有效期，搜索结果变化快，机构规范化结果较稳定
+CACHE_TTL = {
+    'search': 3 * DAY,
+    'workplace': 90 * DAY,
+    'school': 90 * DAY,
+    'summary': 30 * DAY,
+}
+DEFAULT_TTL = 7 * DAY
+EVICT_EVERY = 500
+
+
+def cache_key(endpoint, payload):
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(f'{endpoint}\n{canonical}'.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, mode=CACHE_MODE, max_entries=CACHE_MAX_ENTRIES, ttl=None):
+        self.path = path
+        self.mode = mode
+        self.max_entries = max_entries
+        self.ttl = dict(CACHE_TTL if ttl is None else ttl)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # 连接不能跨进程复用，fork 后重新打开
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, ttl_class TEXT, value TEXT, created REAL, accessed REAL)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, endpoint, payload, ttl_class):
+        """返回 (是否命中, 缓存值)"""
+        if self.mode == 'bypass':
+            return False, None
+        key = cache_key(endpoint, payload)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute('SELECT value, created FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl.get(ttl_class, DEFAULT_TTL):
+                self.misses += 1
+                return False, None
+            if self.mode != 'readonly':
+                conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+                conn.commit()
+            self.hits += 1
+        return True, json.loads(row[0])
+
+    def set(self, endpoint, payload, ttl_class, value):
+        if self.mode != 'readwrite':
+            return
+        key = cache_key(endpoint, payload)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                         (key, ttl_class, json.dumps(value, ensure_ascii=False), now, now))
+            self.writes += 1
+            if self.writes % EVICT_EVERY == 0:
+                self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn, now):
+        for ttl_class, ttl in self.ttl.items():
+            conn.execute('DELETE FROM responses WHERE ttl_class = ? AND created < ?', (ttl_class, now - ttl))
+        # 超出容量时按最近访问时间淘汰
+        conn.execute('DELETE FROM responses WHERE key IN ('
+                     'SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def evict(self):
+        with self._lock:
+            conn = self._connection()
+            self._evict(conn, time.time())
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute('DELETE FROM responses')
+            conn.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'mode': self.mode,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+
+def set_cache(cache):
+    global _cache
+    _cache = cache
+
+
+def cached_post_json(endpoint, payload, ttl_class, cacheable=None, raise_for_status=False):
+    """带持久化缓存的 post_json，cacheable 判断响应是否值得缓存"""
+    cache = get_cache()
+    hit, value = cache.get(endpoint, payload, ttl_class)
+    if hit:
+        return value
+
+    def fetch():
+        value = post_json(endpoint, payload, raise_for_status)
+        if cacheable is None or cacheable(value):
+            cache.set(endpoint, payload, ttl_class, value)
+        return value
+
+    # 第一个请求返回之前缓存还是空的，相同的请求在此合并
+    return singleflight.do(singleflight.flight_key(endpoint, payload), fetch, ttl_class)
+
+
+def has_gpt_answer(response_data):
+    return isinstance(response_data, dict) and response_data.get('data', {}).get('gpt') is not None
+
+
+def has_search_results(response_data):
+    return isinstance(response_data, list) and len(response_data) > 0
+
+
+def has_result(response_data):
+    return isinstance(response_data, dict) and response_data.get('result') is not None
+
+
+def cache_metrics():
+    if _cache is None:
+        return []
+    stats = _cache.stats()
+    return [
+        ('talent_cache_hits_total', 'counter', 'Response cache hits', {}, stats['hits']),
+        ('talent_cache_misses_total', 'counter', 'Response cache misses', {}, stats['misses']),
+        ('talent_cache_writes_total', 'counter', 'Response cache writes', {}, stats['writes']),
+    ]
+
+
+register_callback(cache_metrics)
@@ -0,0 +1,152 @@
+import os
+import re
+import time
+import logging
+import threading
+from transport import post_json
+from concurrency import ordered_map
+from resilience import is_endpoint_failure, endpoint_latency
+from metrics import inc, register_callback
+
+# 二分类提示词的模型级联：先用快模型 hy 回答并给出置信度，置信度不足或答案无法解析时再交给 gpt4o。
+# 每个任务可单独配置：route 为 cascade 先快后强、fast 只用快模型、strong 只用 gpt4o；
+# threshold 为接受快模型答案的最低置信度；samples > 1 时改为多次采样，全部一致且置信度都达到阈值才接受
+logger = logging.getLogger(__name__)
+
+CASCADE = os.environ.get('TALENT_CASCADE', '1') == '1'
+FAST = {'endpoint': 'chat', 'model': 'hy'}
+STRONG = {'endpoint': 'gpt', 'model': 'gpt4o'}
+
+TASK_POLICIES = {
+    'homepage': {'route': 'cascade', 'threshold': 80, 'samples': 1},
+    'relevance': {'route': 'cascade', 'threshold': 80, 'samples': 1},
+    'same_talent': {'route': 'cascade', 'threshold': 90, 'samples': 1},
+    'infer_name': {'route': 'cascade', 'threshold': 85, 'samples': 1},
+}
+for _task, _policy in TASK_POLICIES.items():
+    _policy['route'] = os.environ.get(f'TALENT_CASCADE_{_task.upper()}', _policy['route'])
+    _policy['threshold'] = int(os.environ.get(f'TALENT_CASCADE_{_task.upper()}_THRESHOLD', _policy['threshold']))
+
+CONFIDENCE_INSTRUCTION = (' After the answer, output a second line in the form "Confidence: <0-100>" '
+                          'stating how certain you are of the answer.')
+confidence_pattern = re.compile(r'confidence\s*[:：]\s*(\d{1,3})', re.I)
+chinese_name_pattern = re.compile(r'^[一-龥·]{2,8}$')
+
+_lock = threading.Lock()
+stats = {}
+
+
+def configure_task(task, **policy):
+    TASK_POLICIES.setdefault(task, {'route': 'cascade', 'threshold': 80, 'samples': 1}).update(policy)
+
+
+def parse_binary(answer):
+    has_true, has_false = 'True' in answer, 'False' in answer
+    if has_true == has_false:
+        return None
+    return 'True' if has_true else 'False'
+
+
+def parse_chinese_name(answer):
+    if 'Not Found' in answer:
+        return 'Not Found'
+    answer = answer.strip().strip('"\'“”。.')
+    return answer if chinese_name_pattern.match(answer) else None
+
+
+def split_confidence(word):
+    """返回 (答案文本, 置信度)，没有给出置信度时为 None"""
+    match = confidence_pattern.search(word)
+    if match is None:
+        return word.strip(), None
+    return (word[:match.start()] + word[match.end():]).strip(), min(int(match.group(1)), 100)
+
+
+def _record(task, **values):
+    with _lock:
+        counters = stats.setdefault(task, {'fast_accepted': 0, 'escalated': 0, 'strong_only': 0, 'fast_only': 0,
+                                           'fast_seconds': 0.0, 'strong_seconds': 0.0, 'strong_calls': 0})
+        for key, value in values.items():
+            counters[key] += value
+
+
+def _call(tier, payload):
+    started = time.perf_counter()
+    response_data = post_json(tier['endpoint'], {**payload, 'model': tier['model']})
+    return (response_data.get('data') or {}).get('gpt'), time.perf_counter() - started
+
+
+def _strong(task, payload, route):
+    word, latency = _call(STRONG, payload)
+    _record(task, strong_seconds=latency, strong_calls=1, **{route: 1})
+    inc('talent_cascade_decisions_total', 'Classification calls by cascade route', task=task, route=route)
+    return word
+
+
+def _fast(task, payload, policy, parse):
+    """返回 (各样本一致的答案或 None, 置信度是否都达到阈值, 耗时)"""
+    fast_payload = {**payload, 'text': payload['text'] + CONFIDENCE_INSTRUCTION}
+    samples = max(1, policy.get('samples', 1))
+    try:
+        results = ordered_map(lambda _: _call(FAST, fast_payload), range(samples), samples)
+    except Exception as e:
+        if not is_endpoint_failure(e):
+            raise
+        logger.warning('fast model failed for %s: %s', task, e)
+        return None, False, 0.0
+    latency = max(latency for _, latency in results)
+    parsed = []
+    for word, _ in results:
+        answer, confidence = split_confidence(word) if isinstance(word, str) else (None, None)
+        parsed.append((parse(answer) if answer is not None else None, confidence))
+    labels = {label for label, _ in parsed}
+    if None in labels or len(labels) != 1:
+        return None, False, latency
+    # 单次和多次采样都要求每个样本的置信度达到阈值
+    confident = all(confidence is not None and confidence >= policy['threshold'] for _, confidence in parsed)
+    return labels.pop(), confident, latency
+
+
+def classify(task, payload, parse=parse_binary):
+    """按任务策略路由一次分类请求，返回与直接调用 gpt4o 相同格式的答案文本"""
+    policy = TASK_POLICIES.get(task, {'route': 'strong'})
+    if not CASCADE or policy['route'] == 'strong':
+        return _strong(task, payload, 'strong_only')
+    label, confident, latency = _fast(task, payload, policy, parse)
+    if policy['route'] == 'fast':
+        # 没有更强的模型可升级：采用解析出的答案，无法解析时返回 None，不把带置信度行的原始文本交给调用方
+        _record(task, fast_seconds=latency, fast_only=1)
+        inc('talent_cascade_decisions_total', 'Classification calls by cascade route', task=task, route='fast_only')
+        return label
+    _record(task, fast_seconds=latency)
+    if label is not None and confident:
+        _record(task, fast_accepted=1)
+        inc('talent_cascade_decisions_total', 'Classification calls by cascade route', task=task, route='fast')
+        return label
+    return _strong(task, payload, 'escalated')
+
+
+def task_stats():
+    """各任务的升级比例和估算节省的时间：快模型被接受的次数乘以 gpt4o 平均耗时，减去快模型的总耗时"""
+    with _lock:
+        snapshot = {task: dict(values) for task, values in stats.items()}
+    for task, values in snapshot.items():
+        cascaded = values['fast_accepted'] + values['escalated']
+        values['escalation_rate'] = values['escalated'] / cascaded if cascaded else 0.0
+        # 该任务还没有调用过 gpt4o 时，用 gpt 接口最近的延迟中位数估算
+        if values['strong_calls']:
+            strong_mean = values['strong_seconds'] / values['strong_calls']
+        else:
+            strong_mean = endpoint_latency(STRONG['endpoint'])
+        values['latency_saved'] = None if strong_mean is None else \
+            (values['fast_accepted'] + values['fast_only']) * strong_mean - values['fast_seconds']
+    return snapshot
+
+
+def cascade_metrics():
+    return [('talent_cascade_latency_saved_seconds', 'gauge', 'Estimated latency saved by the model cascade',
+             {'task': task}, round(values['latency_saved'], 3))
+            for task, values in task_stats().items() if values['latency_saved'] is not None]
+
+
+register_callback(cascade_metrics)
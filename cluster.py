@@ -0,0 +1,178 @@
+import re
+import json
+import time
+import logging
+from itertools import combinations
+from collections import deque
+import concurrency
+from concurrency import ordered_map
+from get_talent_doc import name_to_pinyin
+from identity import identity_keys
+from name_index import affiliation_key
+from rubric import judge_same_talent, decide_same_talent
+
+# 全量语料的学者聚类：先按姓名拼音 + 机构分块，再用强身份字段并查集合并，
+# 只有块内仍无法判定的文档对才调用 is_same_talent
+logger = logging.getLogger(__name__)
+
+cjk_pattern = re.compile(r'[一-龥]')
+
+
+class UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        self.parent[max(ra, rb)] = min(ra, rb)
+        return True
+
+
+def name_keys(name):
+    """姓 + 名首字母，拼音姓名姓名顺序不确定时两种顺序都作为分块键"""
+    if not name or not isinstance(name, str):
+        return set()
+    if cjk_pattern.search(name):
+        surname, given = name_to_pinyin(name)[0].lower().split(' ', 1)
+        return {f'{surname}|{given[:1]}'}
+    tokens = [t for t in re.split(r'[^a-z]+', name.lower()) if t]
+    if len(tokens) < 2:
+        return {f'{tokens[0]}|'} if tokens else set()
+    return {f'{tokens[0]}|{tokens[1][:1]}', f'{tokens[-1]}|{tokens[0][:1]}'}
+
+
+def block_documents(docs):
+    """返回 {(姓名键, 机构键): [文档下标]}，缺少机构的文档加入同姓名键的所有分块"""
+    blocks = {}
+    wildcard = {}
+    for i, doc in enumerate(docs):
+        workplace = doc.get('workplace')
+        affiliation = affiliation_key(workplace) if workplace else ''
+        for key in name_keys(doc.get('name')):
+            if affiliation:
+                blocks.setdefault((key, affiliation), []).append(i)
+            else:
+                wildcard.setdefault(key, []).append(i)
+    for key, indices in wildcard.items():
+        matched = [block for block in blocks if block[0] == key]
+        for block in matched:
+            blocks[block].extend(indices)
+        if not matched:
+            blocks[(key, '')] = indices
+    return blocks
+
+
+def same_talent(doc1, doc2):
+    is_same = judge_same_talent(doc1, doc2)
+    return bool(is_same and 'True' in is_same)
+
+
+def same_talent_decision(doc1, doc2):
+    """返回 (是否同一学者, 是否调用了大模型)；评分规则本地判定的文档对不计入大模型调用"""
+    is_same, used_llm = decide_same_talent(doc1, doc2)
+    return bool(is_same and 'True' in is_same), used_llm
+
+
+def decision_judge(judge=None):
+    # 自定义的 judge 无法区分本地判定，每次调用都按一次大模型调用计
+    if judge is None:
+        return same_talent_decision
+    return lambda doc1, doc2: (judge(doc1, doc2), True)
+
+
+def cluster_documents(docs, judge=None, max_workers=None):
+    """返回 (聚类列表, 统计信息)，每个聚类是文档下标列表"""
+    decide = decision_judge(judge)
+    started = time.time()
+    n = len(docs)
+    uf = UnionFind(n)
+
+    # 1. 强身份字段精确合并
+    owners = {}
+    exact_links = 0
+    for i, doc in enumerate(docs):
+        for key in identity_keys(doc):
+            if key in owners:
+                exact_links += uf.union(owners[key], i)
+            else:
+                owners[key] = i
+
+    # 2. 分块后收集块内候选对
+    blocks = block_documents(docs)
+    pairs = set()
+    for indices in blocks.values():
+        pairs.update(combinations(sorted(set(indices)), 2))
+    pairs = sorted(pairs)
+
+    # 3. 按批并发调用大模型，每批前跳过已被传递合并的文档对
+    workers = max_workers or concurrency.MAX_WORKERS
+    judged, llm_calls, llm_links = 0, 0, 0
+    pending = deque(pairs)
+    while pending:
+        # 出队时才检查是否已被合并，不必每批重建剩余列表
+        wave = []
+        while pending and len(wave) < workers:
+            a, b = pending.popleft()
+            if uf.find(a) != uf.find(b):
+                wave.append((a, b))
+        results = ordered_map(lambda pair: decide(docs[pair[0]], docs[pair[1]]), wave, workers)
+        judged += len(wave)
+        for (a, b), (same, used_llm) in zip(wave, results):
+            llm_calls += used_llm
+            if same:
+                llm_links += uf.union(a, b)
+
+    clusters = {}
+    for i in range(n):
+        clusters.setdefault(uf.find(i), []).append(i)
+    naive_pairs = n * (n - 1) // 2
+    stats = {
+        'documents': n,
+        'clusters': len(clusters),
+        'blocks': len(blocks),
+        'exact_links': exact_links,
+        'candidate_pairs': len(pairs),
+        'judged_pairs': judged,
+        'llm_calls': llm_calls,
+        'llm_links': llm_links,
+        'naive_llm_calls': naive_pairs,
+        'llm_calls_saved': naive_pairs - llm_calls,
+        'elapsed': round(time.time() - started, 3),
+    }
+    logger.info('cluster stats: %s', json.dumps(stats))
+    return list(clusters.values()), stats
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='对学者文档做去重聚类')
+    parser.add_argument('input', help='JSONL 文件，每行一个学者文档；batch_runner 的输出取其 doc 字段')
+    parser.add_argument('output', help='聚类结果 JSON 文件')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    docs = []
+    with open(args.input, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if 'row' in record and 'status' in record:
+                record = record.get('doc')
+            if record:
+                docs.append(record)
+    logging.basicConfig(level=logging.INFO)
+    clusters, stats = cluster_documents(docs, max_workers=args.workers)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'clusters': [[docs[i] for i in cluster] for cluster in clusters], 'stats': stats},
+                  f, ensure_ascii=False, indent=1)
+
+
+if __name__ == '__main__':
+    main()
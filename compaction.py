@@ -0,0 +1,101 @@
+import os
+import re
+import logging
+import threading
+from ranking import keyword_pattern
+from metrics import register_callback
+
+# 构造提示词前压缩搜索结果正文：去掉导航和版权等样板文字，保留姓名、机构和关键词附近的句子，
+# 并把每条结果限制在字节预算内
+logger = logging.getLogger(__name__)
+
+ITEM_BYTES = int(os.environ.get('TALENT_ITEM_BYTES', 3000))
+CONTEXT_SENTENCES = 1
+
+boilerplate_pattern = re.compile(
+    r'(首页|登录|注册|版权所有|Copyright|©|ICP备|公网安备|联系我们|返回顶部|网站地图|友情链接|'
+    r'Skip to|Sign in|Log in|Cookie|All rights reserved|Privacy Policy|当前位置|您的位置)', re.I)
+sentence_split_pattern = re.compile(r'(?<=[。！？；!?;\n])|(?<=\. )')
+
+stats = {'calls': 0, 'bytes_in': 0, 'bytes_out': 0}
+_lock = threading.Lock()
+
+
+def utf8_len(text):
+    return len(text.encode('utf-8'))
+
+
+def truncate_bytes(text, budget):
+    return text.encode('utf-8')[:budget].decode('utf-8', errors='ignore')
+
+
+def split_sentences(body):
+    sentences = [s.strip() for s in sentence_split_pattern.split(body)]
+    return [s for s in sentences if s]
+
+
+def is_boilerplate(sentence):
+    return len(sentence) < 40 and bool(boilerplate_pattern.search(sentence))
+
+
+def compact_body(body, terms=(), budget=None):
+    """正文超出预算时才压缩，预算内只做空白归一"""
+    budget = budget or ITEM_BYTES
+    body = re.sub(r'[ \t\r\f\v]+', ' ', body or '')
+    body = re.sub(r'\n\s*\n+', '\n', body).strip()
+    if utf8_len(body) <= budget:
+        return body
+    sentences = [s for s in split_sentences(body) if not is_boilerplate(s)]
+    lowered_terms = [t.lower() for t in terms if t]
+    keep = set()
+    for index, sentence in enumerate(sentences):
+        lowered = sentence.lower()
+        if keyword_pattern.search(sentence) or any(term in lowered for term in lowered_terms):
+            keep.update(range(max(0, index - CONTEXT_SENTENCES), index + CONTEXT_SENTENCES + 1))
+    kept = [sentences[i] for i in sorted(keep) if i < len(sentences)] or sentences
+    return truncate_bytes(' '.join(kept), budget)
+
+
+def compact_item(item, terms=(), budget=None):
+    if not isinstance(item, dict) or not item.get('body'):
+        return item
+    body = item['body']
+    compacted = compact_body(body, terms, budget)
+    before, after = utf8_len(body), utf8_len(compacted)
+    with _lock:
+        stats['calls'] += 1
+        stats['bytes_in'] += before
+        stats['bytes_out'] += after
+    if before != after:
+        logger.debug('compacted item %s: %d -> %d bytes (saved %d)', item.get('url'), before, after, before - after)
+    return {**item, 'body': compacted}
+
+
+def compact_items(items, terms=(), budget=None):
+    return [compact_item(item, terms, budget) for item in items]
+
+
+def query_terms(query):
+    """查询中的姓名、拼音和机构关键字"""
+    if not isinstance(query, dict):
+        return []
+    terms = []
+    name = query.get('name')
+    if isinstance(name, str) and name:
+        terms.append(name)
+        terms.extend(t for t in re.split(r'[\s,]+', name) if len(t) > 1)
+    workplace = query.get('workplace')
+    if isinstance(workplace, str) and workplace:
+        terms.append(workplace)
+        terms.extend(t for t in re.split(r'[\s,]+', workplace) if len(t) > 3)
+    return terms
+
+
+def bytes_saved():
+    return stats['bytes_in'] - stats['bytes_out']
+
+
+register_callback(lambda: [
+    ('talent_compaction_items_total', 'counter', 'Search items passed through compaction', {}, stats['calls']),
+    ('talent_compaction_bytes_saved_total', 'counter', 'Prompt bytes removed by compaction', {}, bytes_saved()),
+])
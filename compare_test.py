@@ -1,14 +1,19 @@
 import json
-from tkinter.font import names
-from get_talent_doc import is_same_talent, get_paper_doc, get_doc
-import numpy as np
-from fastapi import FastAPI, Depends
-from fastapi.responses import JSONResponse, StreamingResponse, Response
-import httpx
+from get_talent_doc import get_paper_doc, get_doc
+from rubric import judge_same_talent
+from identity import identity_match
+from profile_store import get_profile_store
+from reference_index import get_reference_index
+from metrics import timed_stage, render_prometheus
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
-import pandas as pd
-from pypinyin import pinyin, Style
 import re
+import os
+import asyncio
+from typing import List
+from starlette.concurrency import run_in_threadpool
+from concurrent.futures import ThreadPoolExecutor
 
 # app = Flask(__name__)
 app = FastAPI(debug=True, docs_url=None, redoc_url=None)
@@ -23,6 +28,24 @@ class DocRequest(BaseModel):
     doc_str: str
 
 
+class BulkCompareRequest(BaseModel):
+    items: List[CompareRequest]
+
+
+class BulkDocRequest(BaseModel):
+    items: List[DocRequest]
+
+
+class CorpusCompareRequest(BaseModel):
+    doc1_str: str
+
+
+@app.get('/metrics')
+def metrics():
+    return Response(content=render_prometheus(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@timed_stage('compare')
 def compare_function(doc1, doc2):
     if doc2 is None:
         return False
@@ -31,61 +54,11 @@ def compare_function(doc1, doc2):
     if not name2 or name2 == '未找到':
         return False
 
-    workplace1 = doc1.get('workplace')
-    workplace2 = doc2.get('workplace', '')
-    email1 = doc1.get('email', [])
-    email2 = doc2.get('email', [])
-    honor_track1 = doc1.get('honor_track', '[]')
-    try:
-        honor_track1 = json.loads(honor_track1)
-    except:
-        honor_track1 = None
-    honor_track2 = json.loads(doc2.get('honor_track', '[]'))
-
-    # 1. 比较 name + aminer_id
-    aminer_id1 = doc1.get('aminer_id')
-    aminer_id2 = doc2.get('aminer_id')
-    if aminer_id1 and aminer_id2 and aminer_id1 == aminer_id2:
-        return True
-
-    # 2. 比较 name + google_scholar_url
-    google_scholar_url1 = doc1.get('google_scholar_url')
-    google_scholar_url2 = doc2.get('google_scholar_url')
-    if google_scholar_url1 and google_scholar_url2 and google_scholar_url1 == google_scholar_url2:
+    # 1-6. aminer_id、google_scholar_url、mainpage、email、同单位荣誉和奖项
+    if identity_match(doc1, doc2):
         return True
 
-    # 3. 比较 name + mainpage
-    mainpage1 = doc1.get('mainpage')
-    mainpage2 = doc2.get('mainpage')
-    if mainpage1 and mainpage2 and mainpage1 == mainpage2:
-        return True
-
-    # 4. 比较 email
-    if isinstance(email2, str):
-        email2 = [email2]
-    if any(e in email2 for e in email1):
-        return True
-
-    # 5. 比较 honor 字段
-    four_titles = ["中国科学院院士", "中国工程院院士", "国家杰出青年科学基金获得者", "长江学者特聘教授",
-                   "长江学者讲座教授"]
-    if isinstance(honor_track1, list):
-        if workplace1 and workplace2 and workplace1 == workplace2:
-            for h1 in honor_track1:
-                for h2 in honor_track2:
-                    if h1.get('award') in four_titles and h2.get('award') in four_titles:
-                        if h1.get('award') == h2.get('award') and h1.get('time') == h2.get('time'):
-                            return True
-
-    # 6. 比较 prize_relations
-    if workplace1 and workplace2 and workplace1 == workplace2:
-        prize_relations1 = doc1.get('prize_relations', [])
-        prize_relations2 = doc2.get('prize_relations', [])
-        if prize_relations1 is not None and prize_relations2 is not None:
-            if set(prize_relations1) & set(prize_relations2):
-                return True
-
-    is_same = is_same_talent(doc1, doc2)
+    is_same = judge_same_talent(doc1, doc2)
     if is_same and 'True' in is_same:
         return True
 
@@ -122,10 +95,11 @@ def contains_chinese(text):
 def get_talent_doc(doc):
     name = doc['name']
     if contains_chinese(name) == False and not doc.get('honor_track'):
-        updated_doc, candidates = get_paper_doc(doc)
+        kind, pipeline = 'paper', get_paper_doc
     else:
-        updated_doc, candidates = get_doc(doc)
-    return updated_doc, candidates
+        kind, pipeline = 'doc', get_doc
+    # 最近补全过的学者直接从档案库返回，过期时才重新走搜索流程
+    return get_profile_store().fetch(doc, kind, pipeline)
 
 
 def talent_doc(doc_str):
@@ -144,6 +118,27 @@ def talent_doc(doc_str):
             return {"code": 90002, "error": "找到多位候选人信息", "candidates": candidates}
 
 
+def enrich_both(doc1, doc2):
+    """同时补全两份文档，doc1 失败时立即返回，不再等待 doc2
+
+    doc2 先失败时只再等 doc1 的结果：doc1 也失败则报 doc1，保证两方都失败时的错误编号与完成先后无关
+    """
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        future1 = executor.submit(get_talent_doc, doc1)
+        future2 = executor.submit(get_talent_doc, doc2)
+        updated_doc1 = future1.result()[0]
+        if updated_doc1 is None:
+            return 1, None, None
+        updated_doc2 = future2.result()[0]
+        if updated_doc2 is None:
+            return 2, None, None
+        return None, updated_doc1, updated_doc2
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+@timed_stage('main_compare')
 def main_compare(doc1_str, doc2_str):
     try:
         doc1 = json.loads(doc1_str)
@@ -154,6 +149,11 @@ def main_compare(doc1_str, doc2_str):
     except:
         return {"code": 90001, "info": "输入的doc2不符合json格式要求"}
     doc1 = process_doc(doc1)
+    # 补全之前先比较 email、aminer_id 等强身份字段
+    name2 = doc2.get('name')
+    if name2 and name2 != '未找到' and identity_match(doc1, doc2):
+        return {"code": 10000, "result": True}
+
     if without_search(doc1) == True:
         if without_search(doc2) == True:
             flag = compare_function(doc1, doc2)
@@ -165,17 +165,96 @@ def main_compare(doc1_str, doc2_str):
             return {"code": 10000, "result": flag}
         else:
             return {"code": 90003, "result": False, "error": "doc2未找到合适的候选人"}
-    else:
+
+    if without_search(doc2) == True:
         updated_doc1, candidates1 = get_talent_doc(doc1)
-        if without_search(doc2) == True:
-            flag = compare_function(updated_doc1, doc2)
-            return {"code": 10000, "result": flag}
+        if updated_doc1 is None:
+            return {"code": 90004, "result": False, "error": "doc1未找到合适的候选人"}
+        flag = compare_function(updated_doc1, doc2)
+        return {"code": 10000, "result": flag}
 
-        if updated_doc1 is not None:
-            updated_doc2, candidates2 = get_talent_doc(doc2)
-            if updated_doc2 is not None:
-                flag = compare_function(updated_doc1, updated_doc2)
-                return {"code": 10000, "result": flag}
-            else:
-                return {"code": 90003, "result": False, "error": "doc2未找到合适的候选人"}
+    failed, updated_doc1, updated_doc2 = enrich_both(doc1, doc2)
+    if failed == 1:
         return {"code": 90004, "result": False, "error": "doc1未找到合适的候选人"}
+    if failed == 2:
+        return {"code": 90003, "result": False, "error": "doc2未找到合适的候选人"}
+    flag = compare_function(updated_doc1, updated_doc2)
+    return {"code": 10000, "result": flag}
+
+
+def enrich_for_compare(doc):
+    if without_search(doc):
+        return doc
+    updated_doc, candidates = get_talent_doc(doc)
+    return updated_doc
+
+
+@timed_stage('corpus_compare')
+def corpus_compare(doc1_str):
+    """将 doc1 与参考语料中的全部学者比较，返回所有判定为同一学者的文档"""
+    try:
+        doc1 = json.loads(doc1_str)
+    except:
+        return {"code": 90001, "info": "输入的doc1不符合json格式要求"}
+    index = get_reference_index()
+    if index is None:
+        return {"code": 90006, "error": "未加载参考语料，请设置 TALENT_REFERENCE_PATH"}
+    doc1 = process_doc(doc1)
+    matches, stats = index.match(doc1, enrich=enrich_for_compare)
+    for match in matches:
+        doc = index.docs[match['index']]
+        match.update({'id': doc.get('id'), 'name': doc.get('name'), 'workplace': doc.get('workplace')})
+    return {"code": 10000, "result": bool(matches), "matches": matches, "stats": stats}
+
+
+# 批量接口同时处理的条目数
+BULK_CONCURRENCY = int(os.environ.get('TALENT_BULK_CONCURRENCY', 8))
+
+
+async def stream_results(func, args_list):
+    """并发执行，每完成一条就输出一行 NDJSON，慢的条目不会阻塞其余结果"""
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+    async def run(index, args):
+        async with semaphore:
+            try:
+                result = await run_in_threadpool(func, *args)
+            except Exception as e:
+                result = {"code": 90005, "error": f"处理失败: {type(e).__name__}"}
+        return {"index": index, **result}
+
+    tasks = [asyncio.create_task(run(index, args)) for index, args in enumerate(args_list)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            result = await task
+            yield json.dumps(result, ensure_ascii=False) + '\n'
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@app.post('/compare')
+async def compare(request: CompareRequest):
+    return await run_in_threadpool(main_compare, request.doc1_str, request.doc2_str)
+
+
+@app.post('/talent_doc')
+async def talent_doc_route(request: DocRequest):
+    return await run_in_threadpool(talent_doc, request.doc_str)
+
+
+@app.post('/compare/corpus')
+async def compare_corpus(request: CorpusCompareRequest):
+    return await run_in_threadpool(corpus_compare, request.doc1_str)
+
+
+@app.post('/compare/bulk')
+async def compare_bulk(request: BulkCompareRequest):
+    args_list = [(item.doc1_str, item.doc2_str) for item in request.items]
+    return StreamingResponse(stream_results(main_compare, args_list), media_type='application/x-ndjson')
+
+
+@app.post('/talent_doc/bulk')
+async def talent_doc_bulk(request: BulkDocRequest):
+    args_list = [(item.doc_str,) for item in request.items]
+    return StreamingResponse(stream_results(talent_doc, args_list), media_type='application/x-ndjson')
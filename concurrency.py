@@ -0,0 +1,34 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 单次扇出的最大并发数，可通过环境变量 TALENT_MAX_WORKERS 调整
+MAX_WORKERS = int(os.environ.get('TALENT_MAX_WORKERS', 8))
+
+
+def set_max_workers(max_workers):
+    global MAX_WORKERS
+    MAX_WORKERS = max(1, int(max_workers))
+
+
+def ordered_map(func, items, max_workers=None):
+    """有界并发地对 items 执行 func，结果保持输入顺序"""
+    items = list(items)
+    if not items:
+        return []
+    workers = min(max_workers or MAX_WORKERS, len(items))
+    if workers <= 1:
+        return [func(item) for item in items]
+    # 每次扇出使用独立线程池，嵌套调用时不会相互占满
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items))
+
+
+def first_in_order(func, items, accept, max_workers=None):
+    """按批并发执行 func，返回按输入顺序第一个被 accept 的结果，后续批次不再发起"""
+    items = list(items)
+    workers = max_workers or MAX_WORKERS
+    for start in range(0, len(items), workers):
+        for result in ordered_map(func, items[start:start + workers], workers):
+            if accept(result):
+                return result
+    return None
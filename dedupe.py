@@ -0,0 +1,109 @@
+import re
+import random
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrency import first_in_order
+
+# 在调用大模型去重之前，先用 URL 规范化和正文 MinHash 合并镜像、转载和同站点不同写法的页面
+NUM_PERMUTATIONS = 64
+SIMILARITY_THRESHOLD = 0.9
+SHINGLE_SIZE = 3
+MERSENNE_PRIME = (1 << 61) - 1
+# 分片哈希和置换参数都取 32 位，a * h + b 不会超出 uint64，可以用 numpy 一次算完全部置换
+_random = random.Random(20240513)
+PERMUTATIONS = [(_random.randrange(1, 1 << 32), _random.randrange(1 << 32)) for _ in range(NUM_PERMUTATIONS)]
+
+tracking_params = re.compile(r'^(utm_\w+|spm|from|source|src|ref|share\w*|timestamp|t|_)$', re.I)
+index_pages = re.compile(r'/(index|default)\.(html?|php|aspx?|jsp)$', re.I)
+mobile_hosts = ('www.', 'm.', 'wap.', 'mobile.')
+institution_pattern = re.compile(r'(大学|学院|研究所|研究院|科学院|University|Institute|College|Academy)', re.I)
+paper_pattern = re.compile(r'(论文|发表|著作|期刊|Publication|Journal)', re.I)
+
+
+def canonical_url(url):
+    if not url or not isinstance(url, str):
+        return ''
+    parts = urlsplit(url.strip().lower())
+    host = parts.netloc
+    for prefix in mobile_hosts:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    host = host.rsplit(':80', 1)[0] if host.endswith(':80') else host
+    path = index_pages.sub('/', parts.path).rstrip('/') or '/'
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not tracking_params.match(k)))
+    return urlunsplit(('', host, path, query, ''))
+
+
+def item_text(item):
+    if isinstance(item, dict):
+        return f"{item.get('title') or ''} {item.get('body') or ''}"
+    return str(item)
+
+
+def body_text(item):
+    if isinstance(item, dict):
+        return item.get('body') or item.get('title') or ''
+    return str(item)
+
+
+def shingles(text):
+    text = re.sub(r'\s+', '', text.lower())
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    import numpy as np  # 只在合并搜索结果时用到，延迟导入以加快服务启动
+    hashes = np.fromiter((int.from_bytes(hashlib.md5(s.encode('utf-8')).digest()[:4], 'big') for s in shingles(text)),
+                         dtype=np.uint64, count=-1)
+    a, b = np.array(PERMUTATIONS, dtype=np.uint64).T
+    values = (np.outer(a, hashes) + b[:, None]) % np.uint64(MERSENNE_PRIME)
+    return values.min(axis=1).tolist()
+
+
+def estimated_jaccard(signature1, signature2):
+    return sum(x == y for x, y in zip(signature1, signature2)) / len(signature1)
+
+
+def preference(item):
+    """与 deep_processed 的保留规则一致：标题含机构名 > 正文含论文信息 > 正文更长"""
+    title = item.get('title') or '' if isinstance(item, dict) else ''
+    text = item_text(item)
+    return (bool(institution_pattern.search(title)), bool(paper_pattern.search(text)), len(text))
+
+
+def collapse_near_duplicates(items, threshold=SIMILARITY_THRESHOLD):
+    """合并规范化 URL 相同或正文 MinHash 相似度超过阈值的条目，保留顺序和每组中最优的一条"""
+    groups = []
+    by_url = {}
+    signatures = []
+    for item in items:
+        url = canonical_url(item.get('url')) if isinstance(item, dict) else ''
+        group = by_url.get(url) if url else None
+        if group is None:
+            # 规范化 URL 已命中时不必再计算正文签名
+            signature = minhash(body_text(item))
+            for index, other in enumerate(signatures):
+                if estimated_jaccard(signature, other) >= threshold:
+                    group = index
+                    break
+        if group is None:
+            group = len(groups)
+            groups.append([])
+            signatures.append(signature)
+        if url:
+            by_url.setdefault(url, group)
+        groups[group].append(item)
+    return [max(group, key=preference) for group in groups]
+
+
+def keep_distinct(items, is_same, max_workers=None):
+    """每一条都与所有已保留的条目比较，而不只是最后一条"""
+    kept = []
+    for item in items:
+        duplicate = first_in_order(lambda kept_item: is_same(kept_item, item), kept, bool, max_workers)
+        if not duplicate:
+            kept.append(item)
+    return kept
@@ -0,0 +1,335 @@
+import os
+import re
+import json
+import threading
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:  # Windows 下不做跨进程加锁
+    fcntl = None
+
+# 本地机构词典：把 WoS 英文缩写或不完整的中文机构名映射到规范中文名称，
+# 并给出是否为中国大陆高校的判断，只有未命中时才需要调用大模型
+GAZETTEER_PATH = os.environ.get('TALENT_GAZETTEER_PATH', 'gazetteer_learned.json')
+FUZZY_THRESHOLD = float(os.environ.get('TALENT_GAZETTEER_FUZZY', 0.75))
+
+INSTITUTIONS = [
+    ('北京大学', ['Peking Univ', 'Peking University', 'Beijing Univ']),
+    ('清华大学', ['Tsinghua Univ', 'Tsing Hua Univ']),
+    ('复旦大学', ['Fudan Univ']),
+    ('上海交通大学', ['Shanghai Jiao Tong Univ', 'Shanghai Jiaotong Univ', 'SJTU']),
+    ('浙江大学', ['Zhejiang Univ']),
+    ('南京大学', ['Nanjing Univ']),
+    ('南京理工大学', ['Nanjing Univ Sci & Technol']),
+    ('中国科学技术大学', ['Univ Sci & Technol China', 'USTC']),
+    ('中山大学', ['Sun Yat sen Univ', 'Sun Yat-sen Univ', 'Zhongshan Univ']),
+    ('武汉大学', ['Wuhan Univ']),
+    ('华中科技大学', ['Huazhong Univ Sci & Technol']),
+    ('四川大学', ['Sichuan Univ']),
+    ('山东大学', ['Shandong Univ']),
+    ('吉林大学', ['Jilin Univ']),
+    ('南开大学', ['Nankai Univ']),
+    ('天津大学', ['Tianjin Univ']),
+    ('厦门大学', ['Xiamen Univ']),
+    ('同济大学', ['Tongji Univ']),
+    ('西安交通大学', ['Xi An Jiao Tong Univ', 'Xian Jiaotong Univ', 'Xi an Jiaotong Univ']),
+    ('哈尔滨工业大学', ['Harbin Inst Technol']),
+    ('北京航空航天大学', ['Beihang Univ', 'Beijing Univ Aeronaut & Astronaut']),
+    ('北京理工大学', ['Beijing Inst Technol']),
+    ('北京师范大学', ['Beijing Normal Univ']),
+    ('华东师范大学', ['East China Normal Univ']),
+    ('中南大学', ['Cent S Univ', 'Central South Univ']),
+    ('东南大学', ['Southeast Univ']),
+    ('华南理工大学', ['South China Univ Technol']),
+    ('大连理工大学', ['Dalian Univ Technol']),
+    ('重庆大学', ['Chongqing Univ']),
+    ('兰州大学', ['Lanzhou Univ']),
+    ('湖南大学', ['Hunan Univ']),
+    ('电子科技大学', ['Univ Elect Sci & Technol China']),
+    ('中国人民大学', ['Renmin Univ China']),
+    ('中国农业大学', ['China Agr Univ']),
+    ('苏州大学', ['Soochow Univ']),
+    ('郑州大学', ['Zhengzhou Univ']),
+    ('首都医科大学', ['Capital Med Univ']),
+    ('南方医科大学', ['Southern Med Univ']),
+    ('南京医科大学', ['Nanjing Med Univ']),
+    # 台湾也有 China Medical University，只接受带沈阳的写法
+    ('中国医科大学', ['China Med Univ Shenyang']),
+    ('北京协和医学院', ['Peking Union Med Coll', 'Chinese Acad Med Sci & Peking Union Med Coll']),
+    ('中国医学科学院', ['Chinese Acad Med Sci']),
+    ('中国科学院', ['Chinese Acad Sci', 'CAS']),
+    ('中国科学院大学', ['Univ Chinese Acad Sci', 'UCAS']),
+    ('中国科学院上海高等研究院', ['Shanghai Adv Res Inst', '上海高等研究院']),
+    ('中国科学院化学研究所', ['Chinese Acad Sci Inst Chem', '中科院化学所']),
+    ('中国科学院物理研究所', ['Chinese Acad Sci Inst Phys', '中科院物理所']),
+    ('中国科学院大连化学物理研究所', ['Chinese Acad Sci Dalian Inst Chem Phys', 'Dalian Inst Chem Phys', '大连化学物理研究所']),
+    ('中国工程院', ['Chinese Acad Engn']),
+    ('复旦大学附属中山医院', ['Fudan Univ Zhongshan Hosp']),
+    ('复旦大学附属华山医院', ['Fudan Univ Huashan Hosp']),
+    ('复旦大学附属肿瘤医院', ['Fudan Univ Shanghai Canc Ctr']),
+    ('复旦大学附属上海市公共卫生临床中心', ['Fudan Univ Shanghai Publ Hlth Clin Ctr']),
+    ('上海交通大学医学院附属瑞金医院', ['Shanghai Jiao Tong Univ Ruijin Hosp']),
+    ('上海交通大学医学院附属仁济医院', ['Shanghai Jiao Tong Univ Renji Hosp']),
+    ('北京大学人民医院', ['Peking Univ Peoples Hosp']),
+    ('北京大学第一医院', ['Peking Univ First Hosp', 'Peking Univ 1st Hosp']),
+    ('北京大学第三医院', ['Peking Univ Third Hosp', 'Peking Univ 3rd Hosp']),
+    ('中山大学肿瘤防治中心', ['Sun Yat sen Univ Canc Ctr']),
+    ('浙江大学医学院附属妇产科医院', ['Zhejiang Univ Sch Med Womens Hosp']),
+    ('四川大学华西医院', ['Sichuan Univ West China Hosp']),
+    ('中日友好医院', ['China Japan Friendship Hosp']),
+    ('广东省疾病预防控制中心', ['Guangdong Prov Ctr Dis Control & Prevent']),
+    ('中国疾病预防控制中心', ['Chinese Ctr Dis Control & Prevent', 'China CDC']),
+    ('香港大学', ['Univ Hong Kong', 'HKU']),
+    ('香港中文大学', ['Chinese Univ Hong Kong', 'CUHK']),
+    ('香港科技大学', ['Hong Kong Univ Sci & Technol', 'HKUST']),
+    ('香港城市大学', ['City Univ Hong Kong']),
+    ('香港理工大学', ['Hong Kong Polytech Univ']),
+    ('澳门大学', ['Univ Macau']),
+    ('台湾大学', ['Natl Taiwan Univ']),
+]
+
+# WoS 常见缩写
+ABBREVIATIONS = {
+    'univ': 'university', 'hosp': 'hospital', 'sch': 'school', 'coll': 'college',
+    'inst': 'institute', 'acad': 'academy', 'sci': 'sciences', 'technol': 'technology',
+    'med': 'medical', 'natl': 'national', 'ctr': 'center', 'lab': 'laboratory',
+    'dept': 'department', 'res': 'research', 'adv': 'advanced', 'engn': 'engineering',
+    'agr': 'agricultural', 'chem': 'chemistry', 'phys': 'physics', 'biol': 'biology',
+    'polytech': 'polytechnic', 'aeronaut': 'aeronautics', 'astronaut': 'astronautics',
+    'elect': 'electronic', 'prov': 'provincial', 'publ': 'public', 'hlth': 'health',
+    'clin': 'clinical', 'canc': 'cancer', 'dis': 'disease', 'prevent': 'prevention',
+    'cent': 'central', 'peoples': 'peoples', 'affiliated': 'affiliated',
+    '1st': 'first', '3rd': 'third', '&': 'and',
+}
+# 只在特定上下文中展开的缩写，例如 Cent S Univ 中的 S
+PHRASE_ABBREVIATIONS = {
+    ('cent', 's'): ('central', 'south'),
+}
+# 前缀匹配后紧跟这些词时才认为机构名已经结束，避免 Nanjing Univ Sci & Technol 误配南京大学
+UNIT_TOKENS = {'department', 'school', 'college', 'faculty', 'hospital', 'center', 'laboratory', 'key',
+               'state', 'institute', 'division', 'graduate', 'affiliated', 'dept', 'lab'}
+COUNTRY_SUFFIXES = ['peoples r china', 'peoples republic of china', 'china']
+NON_MAINLAND = ['香港', '澳门', '台湾', 'Hong Kong', 'Macau', 'Taiwan']
+
+cjk_pattern = re.compile(r'[一-龥]')
+token_pattern = re.compile(r"[a-z0-9&]+")
+
+
+def expand_abbreviations(text):
+    tokens = token_pattern.findall(text.lower().replace('-', ' '))
+    expanded, i = [], 0
+    while i < len(tokens):
+        pair = tuple(tokens[i:i + 2])
+        if pair in PHRASE_ABBREVIATIONS:
+            expanded.extend(PHRASE_ABBREVIATIONS[pair])
+            i += 2
+            continue
+        expanded.append(ABBREVIATIONS.get(tokens[i], tokens[i]))
+        i += 1
+    return expanded
+
+
+def normalize(text):
+    """中文去空白和标点，英文展开缩写并去掉国家后缀"""
+    if cjk_pattern.search(text):
+        return re.sub(r'[\s,，、()（）]', '', text)
+    tokens = expand_abbreviations(text)
+    joined = ' '.join(tokens)
+    for suffix in COUNTRY_SUFFIXES:
+        if joined.endswith(' ' + suffix):
+            joined = joined[:-len(suffix) - 1]
+            break
+    return joined
+
+
+def trigrams(text):
+    text = f'  {text} '
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def is_mainland_school(name):
+    if any(region in name for region in NON_MAINLAND):
+        return False
+    if '大学' in name or '中国科学院' in name:
+        return True
+    # 以学院结尾的是高校（如北京协和医学院），科学院、工程院是研究机构
+    return name.endswith('学院') and not name.endswith(('科学院', '工程院'))
+
+
+@contextmanager
+def locked_file(path):
+    """在 path.lock 上加排他锁，多个进程写回同一个 JSON 文件时串行执行"""
+    if fcntl is None:
+        yield
+        return
+    with open(f'{path}.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def update_json_file(path, merge):
+    """加锁读取 path 中其他进程已写入的内容，交给 merge(磁盘上的数据) 合并后原子写回"""
+    with locked_file(path):
+        on_disk = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                on_disk = json.load(f)
+        data = merge(on_disk)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+
+class Gazetteer:
+    def __init__(self, institutions=INSTITUTIONS, path=GAZETTEER_PATH):
+        self.path = path
+        self.aliases = {}
+        self.schools = {}
+        self.learned = {'aliases': {}, 'schools': {}}
+        self._trigram_index = {}
+        self._lock = threading.Lock()
+        # 三元组索引单独加锁：resolve 在并发扇出中读取，learn_workplace 和 _save 会同时写入
+        self._index_lock = threading.Lock()
+        for canonical, aliases in institutions:
+            self._add_alias(canonical, canonical)
+            for alias in aliases:
+                self._add_alias(alias, canonical)
+            self.schools[canonical] = is_mainland_school(canonical)
+        self._load()
+
+    def _add_alias(self, alias, canonical):
+        key = normalize(alias)
+        if not key:
+            return
+        with self._index_lock:
+            self.aliases[key] = canonical
+            for gram in trigrams(key):
+                self._trigram_index.setdefault(gram, set()).add(key)
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            self.learned.update(json.load(f))
+        for alias, canonical in self.learned.get('aliases', {}).items():
+            self._add_alias(alias, canonical)
+        self.schools.update(self.learned.get('schools', {}))
+
+    def _save(self):
+        if not self.path:
+            return
+
+        def merge(on_disk):
+            # 其他进程学到的条目一并读入，本进程的新条目优先
+            for alias, canonical in on_disk.get('aliases', {}).items():
+                if alias not in self.learned['aliases']:
+                    self.learned['aliases'][alias] = canonical
+                    self._add_alias(alias, canonical)
+            for workplace, flag in on_disk.get('schools', {}).items():
+                if workplace not in self.learned['schools']:
+                    self.learned['schools'][workplace] = flag
+                    self.schools[workplace] = flag
+            return self.learned
+
+        update_json_file(self.path, merge)
+
+    def candidates(self, workplace):
+        # 依次尝试完整地址、前两段（simple_workplace）和第一段（get_school_name）
+        segments = [s.strip() for s in workplace.split(',') if s.strip()]
+        texts = [workplace]
+        if len(segments) >= 2:
+            texts.append(' '.join(segments[:2]))
+        if segments:
+            texts.append(segments[0])
+        return texts
+
+    def _match_prefix(self, key):
+        if cjk_pattern.search(key):
+            return None
+        tokens = key.split(' ')
+        for end in range(len(tokens) - 1, 0, -1):
+            prefix = ' '.join(tokens[:end])
+            if prefix in self.aliases and tokens[end] in UNIT_TOKENS:
+                return self.aliases[prefix]
+        return None
+
+    def _match_fuzzy(self, key):
+        grams = trigrams(key)
+        counts = {}
+        with self._index_lock:
+            for gram in grams:
+                for alias in self._trigram_index.get(gram, ()):
+                    counts[alias] = counts.get(alias, 0) + 1
+        best, best_score = None, 0.0
+        for alias, shared in counts.items():
+            # 只容忍拼写差异，机构名开头必须一致
+            if alias[:3] != key[:3]:
+                continue
+            score = shared / (len(grams) + len(trigrams(alias)) - shared)
+            if score > best_score:
+                best, best_score = alias, score
+        if best is not None and best_score >= FUZZY_THRESHOLD:
+            return self.aliases[best]
+        return None
+
+    def resolve(self, workplace):
+        """返回规范中文机构名，未命中返回 None"""
+        if not workplace or not isinstance(workplace, str):
+            return None
+        keys = [normalize(text) for text in self.candidates(workplace)]
+        # 先在所有候选上做精确匹配，再做前缀匹配：完整地址的前缀"中国科学院"不应盖过第二段精确命中的化学研究所
+        for key in keys:
+            if key in self.aliases:
+                return self.aliases[key]
+        for key in keys:
+            canonical = self._match_prefix(key)
+            if canonical is not None:
+                return canonical
+        return self._match_fuzzy(keys[-1])
+
+    def school_flag(self, workplace):
+        """返回是否为中国大陆高校，未知返回 None"""
+        if not workplace or not isinstance(workplace, str):
+            return None
+        if workplace in self.schools:
+            return self.schools[workplace]
+        canonical = self.resolve(workplace)
+        if canonical is not None and canonical in self.schools:
+            return self.schools[canonical]
+        return None
+
+    def learn_workplace(self, workplace, canonical):
+        if not workplace or not canonical or not isinstance(workplace, str):
+            return
+        canonical = canonical.strip()
+        with self._lock:
+            self.learned.setdefault('aliases', {})[workplace] = canonical
+            self._add_alias(workplace, canonical)
+            self._save()
+
+    def learn_school(self, workplace, flag):
+        if not workplace or not isinstance(workplace, str):
+            return
+        with self._lock:
+            self.learned.setdefault('schools', {})[workplace] = flag
+            self.schools[workplace] = flag
+            self._save()
+
+
+_gazetteer = None
+
+
+def get_gazetteer():
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+def set_gazetteer(gazetteer):
+    global _gazetteer
+    _gazetteer = gazetteer
@@ -1,24 +1,32 @@
-import pandas as pd
 import re
 import json
-import numpy as np
-import csv
-from concurrent.futures import as_completed, ProcessPoolExecutor
-from tqdm import tqdm
-import requests
-from requests.auth import HTTPBasicAuth
 from pypinyin import pinyin, Style
-import logging
-
-search_url = "http://101.226.141.241/search"
-gpt_url = "http://101.226.141.241/gpt3"
-chat_url = "http://101.226.141.241/chat"
-headers = {
-    "Content-Type": "application/json"
-}
-
-
+from functools import lru_cache
+from transport import post_json, coalesced_post_json
+from cache import cached_post_json, has_gpt_answer, has_search_results, has_result
+from concurrency import ordered_map, first_in_order
+from gazetteer import get_gazetteer
+from name_index import get_name_index
+from name_extract import extract_chinese_name
+from dedupe import collapse_near_duplicates, keep_distinct
+from ranking import rank_hits
+from compaction import compact_item, compact_items, query_terms
+from metrics import timed_stage
+import batch_classify
+import cascade
+import speculative
+from speculative import first_success
+from resilience import degrade_on_failure
+from summary_parser import parse_summary
+from batch_classify import classify_batched, format_items
+
+
+@timed_stage('workplace_normalization')
+@degrade_on_failure('processed_workplace')
 def processed_workplace(workplace):
+    canonical = get_gazetteer().resolve(workplace)  # 优先查本地机构词典
+    if canonical is not None:
+        return canonical
     payload = {
         'text': f"请对输入的工作地点workplace {workplace} 进行以下处理："
                 "1、如果输入的workplace为中文："
@@ -29,13 +37,19 @@ def processed_workplace(workplace):
         'model': 'gpt4o',
         'search': True
     }
-    response = requests.post(gpt_url, headers=headers, data=json.dumps(payload))
-    response_data = response.json()
+    response_data = cached_post_json('gpt', payload, 'workplace', has_gpt_answer)
     word = response_data.get('data', {}).get('gpt')
+    if word:
+        get_gazetteer().learn_workplace(workplace, word)
     return word
 
 
+@timed_stage('school_check')
+@degrade_on_failure('is_school')
 def is_school(workplace):
+    flag = get_gazetteer().school_flag(workplace)
+    if flag is not None:
+        return str(flag)
     payload = {
         'text': f"请判断以下输入的{workplace}是否为中国大陆境内的高等院校，不包括港澳台和海外地区。"
                 f"如果{workplace}包含完整的高等院校名称，请返回True；否则，请返回False。"
@@ -43,23 +57,27 @@ def is_school(workplace):
                 "请只输出推断的结果，即True或False。",
         'model': 'hy',
     }
-    response = requests.post(chat_url, headers=headers, data=json.dumps(payload))
-    response_data = response.json()
+    response_data = cached_post_json('chat', payload, 'school', has_gpt_answer)
     word = response_data.get('data', {}).get('gpt')
+    if word is not None and ('True' in word or 'False' in word):
+        get_gazetteer().learn_school(workplace, 'True' in word)
     return word
 
 
+@timed_stage('search')
+@degrade_on_failure('search_info', dict)
 def search_info(text):
     # 搜索信息
     payload = {
         'text': f"{text}",
         'model': 'hy'
     }
-    response = requests.post(search_url, headers=headers, data=json.dumps(payload))
-    response_data = response.json()
+    response_data = cached_post_json('search', payload, 'search', has_search_results)
     return response_data
 
 
+@timed_stage('search')
+@degrade_on_failure('search_info_google', dict)
 def search_info_google(text):
     payload = {
         'text': f"{text}",
@@ -68,12 +86,11 @@ def search_info_google(text):
         'rewrite': True,
         'expand': True
     }
-    response = requests.post(search_url, headers=headers, data=json.dumps(payload))
-    response_data = response.json()
+    response_data = cached_post_json('search', payload, 'search', has_search_results)
     return response_data
 
 
-def preprocess_sougou_data(datas):
+def preprocess_sougou_data(datas, query=None, budget=None):
     # 初筛并处理信息
     filtered_datas = [{key: d[key] for key in ['url', 'title', 'body'] if key in d} for d in datas]
     filtered_datas = [d for d in filtered_datas if 'body' in d]
@@ -81,39 +98,20 @@ def preprocess_sougou_data(datas):
         d for d in filtered_datas
         if 'zhaopin' not in d.get('url', '')
     ]
-    priority_substrings = ['.edu', '.aminer', '.scholarmate', '.ac', '.org', '.cas', '.cae']
-
-    def contains_keywords(body, keywords):
-        for keyword in keywords:
-            if re.search(keyword, body):
-                return True
-        return False
+    return rank_hits(filtered_datas, query_name_variants(query), require_keywords=True, budget=budget)
 
-    def prioritize_urls(lst, priority_substrings):
-        keywords = [
-            r'(教育背景|学士|硕士|博士|导师|大学|学院|博士后|访问学者)',
-            r'(工作经历|研究员|教授|博士后|公司|研究所)',
-            r'(研究方向|研究领域|研究兴趣)',
-            r'(论文|著作|出版|发表)',
-            r'(奖项|荣誉|获奖|称号)'
-        ]
 
-        filtered_lst = [item for item in lst if contains_keywords(item['body'], keywords)]
-
-        def url_priority(item):
-            url = item.get('url', '')
-            for substring in priority_substrings:
-                if substring in url:
-                    return 0
-            return 1
-
-        sorted_lst = sorted(filtered_lst, key=url_priority)
-        return sorted_lst
-
-    sorted_lst = prioritize_urls(filtered_datas, priority_substrings)
-    return sorted_lst
+def query_name_variants(query):
+    name = (query or {}).get('name')
+    if not name or not isinstance(name, str):
+        return []
+    if re.search(r'[\u4e00-\u9fa5]', name):
+        return [name] + name_to_pinyin(name)
+    return [name]
 
 
+@timed_stage('search')
+@degrade_on_failure('talent_search')
 def talent_search(text):
     payload = {
         'text': f"{text}",
@@ -121,13 +119,15 @@ def talent_search(text):
         'search': True
 
     }
-    response = requests.post(gpt_url, headers=headers, data=json.dumps(payload))
-    response_data = response.json()
+    response_data = post_json('gpt', payload)
     word = response_data.get('data', {}).get('gpt')
     return word
 
 
+@timed_stage('homepage_filter')
+@degrade_on_failure('get_mainpage_info')
 def get_mainpage_info(item):
+    item = compact_item(item)
     payload = {
         'text': f'Given the following information: item={item}. '
                 'Format of item: {"url": url, "title": title, "body": body}. '
@@ -137,13 +137,14 @@ def get_mainpage_info(item):
                 'Please return only "True" if it is a biography or personal homepage, otherwise return "False".',
         'model': 'gpt4o',
     }
-    response = requests.post(gpt_url, headers=headers, data=json.dumps(payload))
-    response_data = response.json()
-    word = response_data.get('data', {}).get('gpt')
-    return word
+    # 先由快模型判定，置信度不足时再交给 gpt4o
+    return cascade.classify('homepage', payload)
 
 
+@timed_stage('relevance_filter')
+@degrade_on_failure('filter_unrelated_info')
 def filter_unrelated_info(item, query):
+    item = compact_item(item, query_terms(query))
     payload = {
         'text': f'Given the following information: item={item},query={query}. '
                 'Format of item: {"url": url, "title": title, "body": body}. '
@@ -158,8 +159,48 @@ def filter_unrelated_info(item, query):
                 'Please return only "True" If the item contains relevant information related to query,otherwise, return "False".',
         'model': 'gpt4o',
     }
-    response = requests.post(gpt_url, headers=headers, data=json.dumps(payload))
-    response_data = response.json()
+    return cascade.classify('relevance', payload)
+
+
+@timed_stage('homepage_filter')
+@degrade_on_failure('get_mainpage_info_batch')
+def get_mainpage_info_batch(items):
+    items = compact_items(items)
+    payload = {
+        'text': f'Given the following numbered items:\n{format_items(items)}\n'
+                'Format of each item: {"url": url, "title": title, "body": body}. '
+                'For each item, determine if it is a biography or personal homepage of an individual. '
+                'The judging criteria are whether the body text contains relevant information such as educational background, work experience, research field etc.'
+                'If the body contains information related to papers or research, it is more likely to be a personal homepage.'
+                'Return exactly one line per item in the form "<number>: True" or "<number>: False", '
+                'in the same order as the input. Do not return any other text.',
+        'model': 'gpt4o',
+    }
+    response_data = post_json('gpt', payload)
+    word = response_data.get('data', {}).get('gpt')
+    return word
+
+
+@timed_stage('relevance_filter')
+@degrade_on_failure('filter_unrelated_info_batch')
+def filter_unrelated_info_batch(items, query):
+    items = compact_items(items, query_terms(query))
+    payload = {
+        'text': f'Given the following numbered items:\n{format_items(items)}\nand query={query}. '
+                'Format of each item: {"url": url, "title": title, "body": body}. '
+                'Format of query: {"name": Chinese character or Pinyin format, "workplace": workplace}. '
+                'For each item, determine if it is related to the query based on the following criteria: '
+                '1. Check if any expression of query["name"] appears in the item, including: '
+                '   - Chinese name (e.g., 齐殿鹏) '
+                '   - Pinyin representation (e.g., qi dianpeng) '
+                '   - English name (e.g., dianpeng qi) '
+                '   Note: The check is case-insensitive and ignores spaces. '
+                '2. Check if the item mentions query["workplace"], considering variations such as Peking Univ and 北京大学 as equivalent. '
+                'Return exactly one line per item in the form "<number>: True" or "<number>: False", '
+                'in the same order as the input. Do not return any other text.',
+        'model': 'gpt4o',
+    }
+    response_data = post_json('gpt', payload)
     word = response_data.get('data', {}).get('gpt')
     return word
 
@@ -169,6 +210,8 @@ def filter_query(name, workplace=None):
     return query_dict
 
 
+@timed_stage('dedupe')
+@degrade_on_failure('deep_processed')
 def deep_processed(datas):
     # 去重
     payload = {
@@ -182,12 +225,12 @@ def deep_processed(datas):
                 "输出请确保满足格式要求：两个字典之间请务必用'||'进行分割，即{dict1}||{dict2}。",
         'model': 'gpt4o',
     }
-    response = requests.post(chat_url, headers=headers, data=json.dumps(payload))
-    response_data = response.json()
+    response_data = post_json('chat', payload)
     word = response_data.get('data', {}).get('gpt')
     return word
 
 
+@degrade_on_failure('is_same_talent')
 def is_same_talent(doc1, doc2):
     if not isinstance(doc1, str):
         doc1_str = json.dumps(doc1, ensure_ascii=False)
@@ -208,19 +251,11 @@ def is_same_talent(doc1, doc2):
                 "请根据得分判断两者是否为同一位学者，得分达到或超过 7 分可判定为同一位学者。请只输出最终的推断答案：True 或 False，不需要中间分析过程。",
         'model': 'gpt4o',
     }
-    response = requests.post(gpt_url, headers=headers, data=json.dumps(payload))
-    response_data = response.json()
-    word = response_data.get('data', {}).get('gpt')
-    return word
-
-
-url = 'http://stream-server-online-hyaide-app.turbotke.production.polaris:81/openapi/app_platform/app_create'
-hy_headers = {
-    'Authorization': 'Bearer 7auGXNATFSKl7dF',
-    'Content-Type': 'application/json'
-}
+    return cascade.classify('same_talent', payload)
 
 
+@timed_stage('summary')
+@degrade_on_failure('summary_info')
 def summary_info(query):
     if not isinstance(query, str):
         query = json.dumps(query, ensure_ascii=False)
@@ -229,24 +264,28 @@ def summary_info(query):
         "forward_service": "hyaide-application-4745",
         "query_id": "qid_123456"
     }
-    response = requests.post(url, headers=hy_headers, data=json.dumps(data))
-    response.raise_for_status()
-    word = response.json().get('result', None)
+    response_data = cached_post_json('hyaide', data, 'summary', has_result, raise_for_status=True)
+    word = response_data.get('result', None)
     return word
 
 
+@degrade_on_failure('url_search')
 def url_search(query):
     data = {
         "query": query,
         "forward_service": "hyaide-application-4748",
         "query_id": "qid_123456"
     }
-    response = requests.post(url, headers=hy_headers, data=json.dumps(data))
-    response.raise_for_status()
-    word = response.json().get('result', None)
+    response_data = coalesced_post_json('hyaide', data, raise_for_status=True)
+    word = response_data.get('result', None)
     return word
 
 
+def same_talent_text(text1, text2):
+    is_same = is_same_talent(text1, text2)
+    return is_same is not None and 'True' in is_same
+
+
 def process_email(email2):
     if isinstance(email2, str):
         return [email2]
@@ -299,56 +338,70 @@ def process_single_candidate(candidate):
     url = candidate['url']
     doc2_extra = candidate['body']
     if len(doc2_extra) < 200:
-        doc2_extra = url_search(url)
+        doc2_extra = url_search(url) or doc2_extra
     doc2_extra_summary = summary_info(doc2_extra)
     return doc2_extra_summary
 
 
-def search_candidate(text, query, candidates, key='sougou'):
+def check_candidate_item(item, query):
+    mainpage_info = get_mainpage_info(item)  # 获取主页信息
+    if mainpage_info is None or 'True' not in mainpage_info:
+        return False
+    filtered_info = filter_unrelated_info(item, query)  # 删去不相关信息
+    return filtered_info is not None and 'True' in filtered_info
+
+
+def check_candidate_items_batched(items, query, max_workers=None):
+    # 每个请求判定多条，解析不出的条目回退到单条判定
+    verdicts = classify_batched(items, get_mainpage_info_batch, get_mainpage_info, max_workers=max_workers)
+    info2 = [item for item, verdict in zip(items, verdicts) if verdict is not None and 'True' in verdict]
+    if len(info2) == 0:
+        return []
+    verdicts = classify_batched(info2, lambda batch: filter_unrelated_info_batch(batch, query),
+                                lambda item: filter_unrelated_info(item, query), max_workers=max_workers)
+    return [item for item, verdict in zip(info2, verdicts) if verdict is not None and 'True' in verdict]
+
+
+@timed_stage('search_candidate')
+def search_candidate(text, query, candidates, key='sougou', max_workers=None):
     if key == 'sougou':
         data = search_info(text)
-        info1 = preprocess_sougou_data(data)
+        info1 = preprocess_sougou_data(data, query)
     else:
         data = search_info_google(text)
-        info1 = preprocess_google_data(data)
+        info1 = preprocess_google_data(data, query)
     if isinstance(info1,dict):
         return None,candidates
 
-    info2, info3, info4, info5 = [], [], [], []
-    for item in info1:  # 获取主页信息
-        mainpage_info = get_mainpage_info(item)
-        if mainpage_info is not None and 'True' in mainpage_info:
-            info2.append(item)
-    if len(info2) == 0:
-        return None, candidates
-
-    for item in info2:  # 删去不相关信息
-        filtered_info = filter_unrelated_info(item, query)
-        if filtered_info is not None and 'True' in filtered_info:
-            info3.append(item)
+    if batch_classify.BATCH_MODE:
+        info3 = check_candidate_items_batched(info1, query, max_workers)
+    else:
+        # 主页判断与相关性过滤按条目流水线并发执行，结果保持原顺序
+        checked = ordered_map(lambda item: check_candidate_item(item, query), info1, max_workers)
+        info3 = [item for item, passed in zip(info1, checked) if passed]
     if len(info3) == 0:
         return None, candidates
-    elif len(info3) == 1:
+    info3 = collapse_near_duplicates(info3)  # 本地合并镜像和转载页面
+    if len(info3) == 1:
         return process_single_candidate(info3[0]), candidates
 
-    info4 = deep_processed(json.dumps(info3, ensure_ascii=False))  # 删除重复信息
+    # 压缩后的正文只用于去重提示词，选中的候选人仍按 url 取回完整正文
+    originals = {item.get('url'): item for item in info3}
+    info4 = deep_processed(json.dumps(compact_items(info3, query_terms(query)), ensure_ascii=False))  # 删除重复信息
     if info4 is None or 'None' in info4 or info4 == '' or 'example.com' in info4 or 'python' in info4 or 'import' in info4:
         return None, candidates
     if '||' not in info4:
         candidate = extract_dict_url(info4)
         if candidate:
+            candidate = originals.get(candidate['url'], candidate)
             return process_single_candidate(candidate), candidates
 
-    info4_lst = info4.split('||')
-    for word in info4_lst:
-        if info5:
-            is_same = is_same_talent(info5[-1], word)
-            if is_same is not None and 'True' in is_same:
-                continue
-        info5.append(word)
+    info4_lst = collapse_near_duplicates(info4.split('||'))
+    info5 = keep_distinct(info4_lst, same_talent_text)
     if len(info5) == 1:
         candidate = extract_dict_url(info5[0])
         if candidate:
+            candidate = originals.get(candidate['url'], candidate)
             return process_single_candidate(candidate), candidates
     else:
         candidates.append(info5)
@@ -420,14 +473,8 @@ def handle_search_result(doc2_extra, candidates):
             doc2_extra_summary = summary_info(doc2_extra)
             return doc2_extra_summary, candidates
         else:
-            info = []
-            doc2_extra_lst = doc2_extra.split('||')
-            for word in doc2_extra_lst:
-                if info:
-                    is_same = is_same_talent(info[-1], word)
-                    if is_same is not None and 'True' in is_same:
-                        continue
-                info.append(word)
+            doc2_extra_lst = collapse_near_duplicates(doc2_extra.split('||'))
+            info = keep_distinct(doc2_extra_lst, same_talent_text)
             if len(info) == 1:
                 doc2_extra_summary = summary_info(info[0])
                 return doc2_extra_summary, candidates
@@ -436,7 +483,7 @@ def handle_search_result(doc2_extra, candidates):
 
     return None, candidates
 
-def preprocess_google_data(data_list):
+def preprocess_google_data(data_list, query=None, budget=None, truncate=True):
     filtered_data = []
     for item in data_list:
         if 'pagemap' in item and 'metatags' in item['pagemap'] and 'citation_keywords' in item['pagemap']['metatags'][
@@ -449,10 +496,13 @@ def preprocess_google_data(data_list):
                 'body': item.get('body')
             }
             filtered_data.append(filtered_item)
-    return filtered_data
+    return rank_hits(filtered_data, query_name_variants(query), require_keywords=False, budget=budget,
+                     truncate=truncate)
 
 
+@degrade_on_failure('infer_name')
 def infer_name(item,query):
+    item = compact_item(item, query_terms(query))
     payload = {
         'text':f'Given the following information: item={item} '
         'Format of item: {"url": url, "title": title, "body": body}. '
@@ -463,18 +513,15 @@ def infer_name(item,query):
         'Do not return any other information. Ignore intermediate processing.',
         'model':'gpt4o',
     }
-    response = requests.post(gpt_url, headers=headers, data=json.dumps(payload))
-    response_data = response.json()
-    word = response_data.get('data', {}).get('gpt')
-    return word
+    return cascade.classify('infer_name', payload, cascade.parse_chinese_name)
 
 
-def infer_chinese_name(info, query):
-    for item in info:
-        response = infer_name(item, query)
-        if response is not None and 'Not Found' not in response:
-            return response
-    return None
+def infer_chinese_name(info, query, max_workers=None):
+    chinese_name = extract_chinese_name(info, query.get('name'))  # 先在正文中就地匹配
+    if chinese_name is not None:
+        return chinese_name
+    return first_in_order(lambda item: infer_name(item, query), info,
+                          lambda response: response is not None and 'Not Found' not in response, max_workers)
 
 
 def get_school_name(affiliation):
@@ -512,39 +559,20 @@ def get_chinese_name(doc2, key='google'):
     if isinstance(info, dict):
         return None
 
-    processed_info = preprocess_info(info, key)
-    chinese_name = infer_chinese_name(processed_info, filter_query(name, address))
+    query = filter_query(name, address)
+    processed_info = preprocess_info(info, key, query)
+    chinese_name = infer_chinese_name(processed_info, query)
     return chinese_name
 
 
-def preprocess_info(info, key):
+def preprocess_info(info, key, query=None):
     if key == 'google':
-        return preprocess_google_data(info)
+        # 推断中文名需要召回：只按得分排序，不按摘要流程的调用预算截断
+        return preprocess_google_data(info, query, truncate=False)
     else:
         return [{k: d[k] for k in ['url', 'title', 'body'] if k in d} for d in info]
 
 
-def extract_fields_using_regex(doc2_summary):
-    """使用正则表达式从doc2_summary中提取字段"""
-    fields = ["name", "email", "workplace", "education_track", "professional_track", "honor_track", "keywords"]
-    extracted_data = {}
-
-    for field in fields:
-        pattern = f'"{field}"\s*:\s*(\[.*?\]|".*?"|null)'
-        match = re.search(pattern, doc2_summary)
-        if match:
-            value = match.group(1)
-            if value == "null":
-                extracted_data[field] = None
-            elif value.startswith('['):
-                try:
-                    extracted_data[field] = json.loads(value)
-                except:
-                    extracted_data[field] = []
-            else:
-                extracted_data[field] = value.strip('"')
-    return extracted_data
-
 def is_dict_empty_or_null(d):
     """检查字典中的所有值是否都为 null"""
     return all(value in [None, "null"] for value in d.values())
@@ -565,14 +593,12 @@ def update_field(doc2_field, summary_field):
     return json.dumps(doc2_field + summary_field, ensure_ascii=False)
 
 def update_doc2_from_summary(doc2, doc2_summary):
-    try:
-        summary_data = json.loads(doc2_summary)
-    except json.JSONDecodeError:
-        summary_data = extract_fields_using_regex(doc2_summary)
+    # 格式有误但可恢复的摘要也能取出字段，避免 check() 丢弃后重新检索
+    summary_data = parse_summary(doc2_summary)
 
     for col in ['name', 'workplace']:
-        if summary_data.get(col) != 'null':
-            doc2[col] = summary_data.get(col, doc2.get(col))
+        if summary_data.get(col) is not None:
+            doc2[col] = summary_data[col]
 
     for col in ['email', 'keywords']:
         if doc2.get(col) is None:
@@ -588,10 +614,23 @@ def update_doc2_from_summary(doc2, doc2_summary):
 
 def check(updated_doc2):
     edu,pro,key=updated_doc2.get('education_track'),updated_doc2.get('professional_track'),updated_doc2.get('keywords')
-    if (edu in ['[]','[null]']) and (pro in ['[]','[null]']) and (key==[] or key==[None]):
+    # 摘要没有给出履历时字段可能仍为 None 或缺失，同样视为空
+    if (edu in [None,'[]','[null]']) and (pro in [None,'[]','[null]']) and (key in [None,[],[None]]):
         return None
     return updated_doc2
 
+def speculative_search(search_text, chat_text, query):
+    # 搜狗检索与 talent_search 同时启动，优先采用搜狗的结果
+    branches = [
+        lambda: search_candidate(search_text, query, [], 'sougou'),
+        lambda: handle_search_result(talent_search(chat_text), []),
+    ]
+    winner, results = first_success(branches, lambda result: result is not None and result[0] is not None)
+    candidates = [c for result in results[:winner + 1] if result is not None for c in result[1]]
+    return results[winner][0], candidates
+
+
+@timed_stage('get_doc')
 def get_doc(doc2):
     name2 = doc2.get('name')
     workplace2 = doc2.get('workplace')
@@ -617,7 +656,9 @@ def get_doc(doc2):
     doc2_extra_summary, updated_doc2 = None, None
     if workplace2:
         flag = is_school(workplace2)
-        if flag is not None and 'True' in flag:
+        if flag is not None and 'True' in flag and speculative.SPECULATIVE:
+            doc2_extra_summary, candidates = speculative_search(search_text, chat_text, query)
+        elif flag is not None and 'True' in flag:
             doc2_extra_summary, candidates = search_candidate(search_text, query, candidates, 'sougou')
             if doc2_extra_summary is None:
                 doc2_extra = talent_search(chat_text)
@@ -636,25 +677,61 @@ def get_doc(doc2):
 
     return updated_doc2, candidates
 
+@timed_stage('chinese_name_inference')
 def fetch_chinese_name(doc2,name):
     workplace=doc2.get('workplace','')
-    chinese_name = get_chinese_name(doc2)
-    if chinese_name is None:
-        chinese_name = get_chinese_name(doc2, 'sougou')
+    chinese_name = get_name_index().lookup(name, workplace)  # 已解析过的 (拼音, 机构) 直接返回
+    if chinese_name is not None:
+        return chinese_name
+    if speculative.SPECULATIVE:
+        # Google 与搜狗同时查询，Google 的结果通过拼音校验时优先采用
+        branches = [lambda: get_chinese_name(doc2), lambda: get_chinese_name(doc2, 'sougou')]
+        accept = lambda result: result is not None and ('Hong Kong' in workplace or name in name_to_pinyin(result))
+        winner, results = first_success(branches, accept)
+        chinese_name = results[winner]
     else:
-        pinyin_format = name_to_pinyin(chinese_name)
-        if 'Hong Kong' not in workplace and name not in pinyin_format:
+        chinese_name = get_chinese_name(doc2)
+        if chinese_name is None:
             chinese_name = get_chinese_name(doc2, 'sougou')
+        else:
+            pinyin_format = name_to_pinyin(chinese_name)
+            if 'Hong Kong' not in workplace and name not in pinyin_format:
+                chinese_name = get_chinese_name(doc2, 'sougou')
+    if chinese_name is not None:
+        pinyin_format = name_to_pinyin(chinese_name)
+        if name in pinyin_format:
+            get_name_index().add(chinese_name, pinyin_format, workplace)
     return chinese_name
 
-def name_to_pinyin(name):
+@lru_cache(maxsize=65536)
+def _name_to_pinyin(name):
     pinyin_list = pinyin(name, style=Style.NORMAL)
     surname = pinyin_list[0][0].capitalize()
     given_name = ''.join([item[0] for item in pinyin_list[1:]]).capitalize()
     all_pinyin = ' '.join([item[0].capitalize() for item in pinyin_list])
-    return [f"{surname} {given_name}",all_pinyin, f"{given_name} {surname}"]
+    return (f"{surname} {given_name}",all_pinyin, f"{given_name} {surname}")
+
+def name_to_pinyin(name):
+    return list(_name_to_pinyin(name))
+
+
+def speculative_paper_doc(doc, name, chinese_name):
+    # 三种姓名的 get_doc 同时尝试，按 原中文名 > 搜狗中文名 > 拼音名 的优先级取结果
+    def with_name(new_name):
+        return get_doc({**doc, 'name': new_name})
+
+    def sougou_branch():
+        sougou_name = get_chinese_name({**doc, 'name': name}, 'sougou')
+        return with_name(sougou_name) if sougou_name is not None else (None, [])
+
+    branches = [lambda: with_name(doc['name']), sougou_branch]
+    if chinese_name is not None:
+        branches.append(lambda: with_name(name))
+    winner, results = first_success(branches, lambda result: result is not None and result[0] is not None)
+    return results[winner]
 
 
+@timed_stage('get_paper_doc')
 def get_paper_doc(doc):
     name = process_name(doc['name'])
     doc['name'] = name
@@ -662,6 +739,8 @@ def get_paper_doc(doc):
     doc['workplace']=simple_workplace(doc['workplace'])
     if chinese_name is not None:
         doc['name'] = chinese_name
+    if speculative.SPECULATIVE:
+        return speculative_paper_doc(doc, name, chinese_name)
     updated_doc, candidates = get_doc(doc)
     if updated_doc is None:
         doc['name'] = name
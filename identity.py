@@ -0,0 +1,49 @@
+import json
+
+# 与 compare_function 一致的强身份字段，任一相同即可判定为同一学者
+four_titles = ["中国科学院院士", "中国工程院院士", "国家杰出青年科学基金获得者", "长江学者特聘教授",
+               "长江学者讲座教授"]
+
+
+def load_track(track):
+    if isinstance(track, list):
+        return track
+    if isinstance(track, str):
+        try:
+            track = json.loads(track)
+        except json.JSONDecodeError:
+            return []
+        return track if isinstance(track, list) else []
+    return []
+
+
+def as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [v for v in value if v]
+
+
+def identity_keys(doc):
+    """返回文档的身份键集合：aminer_id、google_scholar_url、mainpage、email、同单位的荣誉和奖项"""
+    keys = set()
+    for field in ['aminer_id', 'google_scholar_url', 'mainpage']:
+        value = doc.get(field)
+        if value:
+            keys.add((field, str(value)))
+    for email in as_list(doc.get('email')):
+        if isinstance(email, str):
+            keys.add(('email', email.strip().lower()))
+    workplace = doc.get('workplace')
+    if workplace:
+        for honor in load_track(doc.get('honor_track')):
+            if isinstance(honor, dict) and honor.get('award') in four_titles:
+                keys.add(('honor', honor.get('award'), str(honor.get('time')), workplace))
+        for prize in as_list(doc.get('prize_relations')):
+            keys.add(('prize', str(prize), workplace))
+    return keys
+
+
+def identity_match(doc1, doc2):
+    return bool(identity_keys(doc1) & identity_keys(doc2))
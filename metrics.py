@@ -0,0 +1,127 @@
+import time
+import threading
+from functools import wraps
+from contextlib import contextmanager
+
+# 进程内指标，按 Prometheus 文本格式导出
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_lock = threading.Lock()
+_metrics = {}
+_callbacks = []
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=None):
+    items = list(key) + (list(extra.items()) if extra else [])
+    if not items:
+        return ''
+    escaped = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in items)
+    return '{' + escaped + '}'
+
+
+def _metric(name, kind, help_text, buckets=None):
+    with _lock:
+        if name not in _metrics:
+            _metrics[name] = {'type': kind, 'help': help_text, 'buckets': buckets, 'series': {}}
+        return _metrics[name]
+
+
+def inc(name, help_text='', value=1, **labels):
+    metric = _metric(name, 'counter', help_text)
+    key = _label_key(labels)
+    with _lock:
+        metric['series'][key] = metric['series'].get(key, 0) + value
+
+
+def observe(name, value, help_text='', buckets=LATENCY_BUCKETS, **labels):
+    metric = _metric(name, 'histogram', help_text, buckets)
+    key = _label_key(labels)
+    with _lock:
+        series = metric['series'].get(key)
+        if series is None:
+            series = metric['series'][key] = {'counts': [0] * len(metric['buckets']), 'sum': 0.0, 'count': 0}
+        for i, bound in enumerate(metric['buckets']):
+            if value <= bound:
+                series['counts'][i] += 1
+        series['sum'] += value
+        series['count'] += 1
+
+
+def register_callback(callback):
+    """callback 返回 [(名称, 类型, 说明, 标签dict, 数值)]，在导出时调用"""
+    _callbacks.append(callback)
+
+
+@contextmanager
+def stage(name):
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc('talent_stage_errors_total', 'Stage invocations that raised', stage=name)
+        raise
+    finally:
+        inc('talent_stage_calls_total', 'Stage invocations', stage=name)
+        observe('talent_stage_latency_seconds', time.perf_counter() - started,
+                'Stage latency in seconds', stage=name)
+
+
+def timed_stage(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_request(endpoint, model, latency, request_bytes, response_bytes, error=None):
+    inc('talent_endpoint_requests_total', 'Requests sent per endpoint and model', endpoint=endpoint, model=model)
+    if error is not None:
+        inc('talent_endpoint_errors_total', 'Failed requests per endpoint and model',
+            endpoint=endpoint, model=model, error=error)
+    observe('talent_endpoint_latency_seconds', latency, 'Request latency in seconds',
+            endpoint=endpoint, model=model)
+    observe('talent_endpoint_request_bytes', request_bytes, 'Request body size in bytes', BYTES_BUCKETS,
+            endpoint=endpoint, model=model)
+    if response_bytes is not None:
+        observe('talent_endpoint_response_bytes', response_bytes, 'Response body size in bytes', BYTES_BUCKETS,
+                endpoint=endpoint, model=model)
+
+
+def render_prometheus():
+    lines = []
+    with _lock:
+        snapshot = {name: {**metric, 'series': dict(metric['series'])} for name, metric in _metrics.items()}
+    for name, metric in sorted(snapshot.items()):
+        lines.append(f'# HELP {name} {metric["help"]}')
+        lines.append(f'# TYPE {name} {metric["type"]}')
+        for key, value in metric['series'].items():
+            if metric['type'] == 'histogram':
+                for bound, count in zip(metric['buckets'], value['counts']):
+                    lines.append(f'{name}_bucket{_format_labels(key, {"le": bound})} {count}')
+                lines.append(f'{name}_bucket{_format_labels(key, {"le": "+Inf"})} {value["count"]}')
+                lines.append(f'{name}_sum{_format_labels(key)} {value["sum"]}')
+                lines.append(f'{name}_count{_format_labels(key)} {value["count"]}')
+            else:
+                lines.append(f'{name}{_format_labels(key)} {value}')
+    seen = set()
+    for callback in _callbacks:
+        for name, kind, help_text, labels, value in callback():
+            if name not in seen:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                seen.add(name)
+            lines.append(f'{name}{_format_labels(_label_key(labels))} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
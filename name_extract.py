@@ -0,0 +1,64 @@
+import re
+from urllib.parse import urlparse
+from pypinyin import lazy_pinyin
+
+# 在搜索结果正文中就地查找与拼音姓名对应的中文名，例如 "齐殿鹏 (Dianpeng Qi)"
+cjk_run_pattern = re.compile(r'[一-龥]{2,}')
+TRADITIONAL_HOST_SUFFIXES = ('.hk', '.tw', '.mo')
+
+
+def compact(name):
+    return re.sub(r'[^a-z]', '', name.lower())
+
+
+def pinyin_targets(name):
+    """拼音姓名的姓前、名前两种紧凑写法"""
+    tokens = [t for t in re.split(r'[\s\-,]+', name.lower()) if t]
+    if not tokens:
+        return set()
+    return {''.join(tokens), ''.join(tokens[1:] + tokens[:1]), ''.join(tokens[-1:] + tokens[:-1])}
+
+
+def name_candidates(text, targets):
+    found = []
+    for run in cjk_run_pattern.findall(text):
+        syllables = lazy_pinyin(run)
+        if len(syllables) != len(run):
+            continue
+        for start in range(len(run) - 1):
+            for length in (2, 3, 4):
+                if start + length > len(run):
+                    break
+                parts = syllables[start:start + length]
+                # 姓在前或名在前都可以，复姓占两个字
+                orders = [''.join(parts), ''.join(parts[1:] + parts[:1])]
+                if length >= 3:
+                    orders.append(''.join(parts[2:] + parts[:2]))
+                if any(order in targets for order in orders):
+                    found.append(run[start:start + length])
+    return found
+
+
+def is_traditional_source(item):
+    host = urlparse(item.get('url') or '').netloc.lower()
+    return host.endswith(TRADITIONAL_HOST_SUFFIXES)
+
+
+def extract_chinese_name(info, name):
+    """所有条目中只出现唯一一个拼音吻合的中文名时返回该名字，否则返回 None"""
+    if not name or not isinstance(name, str):
+        return None
+    targets = pinyin_targets(name)
+    names = set()
+    for item in info:
+        if not isinstance(item, dict):
+            continue
+        text = f"{item.get('title') or ''}\n{item.get('body') or ''}"
+        candidates = name_candidates(text, targets)
+        if candidates and is_traditional_source(item):
+            # 港澳台页面可能是繁体，交给大模型转换
+            return None
+        names.update(candidates)
+    if len(names) == 1:
+        return names.pop()
+    return None
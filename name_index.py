@@ -0,0 +1,102 @@
+import os
+import re
+import json
+import threading
+from gazetteer import get_gazetteer, normalize, update_json_file
+
+# 拼音 + 机构 -> 中文名 的反向索引，命中时无需再搜索推断中文名
+NAME_INDEX_PATH = os.environ.get('TALENT_NAME_INDEX_PATH', 'name_index.json')
+
+
+def pinyin_key(name):
+    return re.sub(r'[\s\-]+', ' ', name).strip().lower()
+
+
+def affiliation_key(workplace):
+    if not workplace or not isinstance(workplace, str):
+        return ''
+    canonical = get_gazetteer().resolve(workplace)
+    if canonical is not None:
+        return canonical
+    return normalize(workplace.split(',')[0])
+
+
+class NameIndex:
+    def __init__(self, path=NAME_INDEX_PATH):
+        self.path = path
+        self.entries = {}
+        self.index = {}
+        self.hits = 0
+        self.misses = 0
+        self.ambiguous = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for entry in json.load(f).get('entries', []):
+                self._add(entry['name'], entry['pinyin'], entry['affiliation'])
+
+    def _save(self):
+        if not self.path:
+            return
+
+        def merge(on_disk):
+            # 先并入其他进程写入的条目，避免多进程互相覆盖
+            for entry in on_disk.get('entries', []):
+                if (entry['name'], entry['affiliation']) not in self.entries:
+                    self._add(entry['name'], entry['pinyin'], entry['affiliation'])
+            return {'entries': [{'name': name, 'affiliation': affiliation, 'pinyin': variants}
+                                for (name, affiliation), variants in self.entries.items()]}
+
+        update_json_file(self.path, merge)
+
+    def _add(self, chinese_name, variants, affiliation):
+        # 拼音在写入时计算一次并随索引持久化；同音不同名（王伟/汪威）放在同一个集合里
+        self.entries[(chinese_name, affiliation)] = list(variants)
+        for variant in variants:
+            self.index.setdefault((pinyin_key(variant), affiliation), set()).add(chinese_name)
+
+    def lookup(self, name, workplace):
+        """只有拼音和机构对应唯一一个中文名时才返回，同音冲突时返回 None 交给搜索推断"""
+        if not name:
+            return None
+        names = self.index.get((pinyin_key(name), affiliation_key(workplace)), ())
+        if len(names) != 1:
+            if names:
+                self.ambiguous += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return next(iter(names))
+
+    def add(self, chinese_name, variants, workplace):
+        affiliation = affiliation_key(workplace)
+        if not chinese_name or not affiliation:
+            return
+        with self._lock:
+            if (chinese_name, affiliation) in self.entries:
+                return
+            self._add(chinese_name, variants, affiliation)
+            self._save()
+
+    def stats(self):
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'ambiguous': self.ambiguous}
+
+
+_name_index = None
+
+
+def get_name_index():
+    global _name_index
+    if _name_index is None:
+        _name_index = NameIndex()
+    return _name_index
+
+
+def set_name_index(name_index):
+    global _name_index
+    _name_index = name_index
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from name_index import pinyin_key, affiliation_key
+from identity import load_track, as_list
+from metrics import inc, register_callback
+
+# 补全后的学者档案存储：SQLite 持久化，外加一层有容量上限的内存热数据。
+# 新鲜的档案直接返回；接近过期时在后台重新跑一遍流程，过期后同步重跑
+logger = logging.getLogger(__name__)
+
+PROFILE_PATH = os.environ.get('TALENT_PROFILE_PATH', 'talent_profiles.sqlite3')
+# readwrite 读写，readonly 只读不写，bypass 完全绕过
+PROFILE_MODE = os.environ.get('TALENT_PROFILE_MODE', 'readwrite')
+PROFILE_HOT_ENTRIES = int(os.environ.get('TALENT_PROFILE_HOT_ENTRIES', 2000))
+
+DAY = 24 * 3600
+FRESH_TTL = float(os.environ.get('TALENT_PROFILE_TTL', 14 * DAY))
+# 档案年龄超过 FRESH_TTL 的这一比例后，命中时触发后台刷新
+REFRESH_AFTER = 0.75
+REFRESH_WORKERS = 2
+
+
+def email_set(email):
+    if not email:
+        return []
+    if isinstance(email, str):
+        email = [email]
+    return sorted({e.strip().lower() for e in email if isinstance(e, str) and e.strip()})
+
+
+TRACK_FIELDS = ('honor_track', 'education_track', 'professional_track')
+
+
+def canonical_field(field, value):
+    # talent_doc 传入原始 JSON 字符串，main_compare 和 corpus_compare 先经过 process_doc 转成列表或 None，
+    # 规整成同一形式后同一学者在各个接口间共用一条档案
+    if field in TRACK_FIELDS:
+        return load_track(value)
+    if field == 'keywords':
+        return sorted({k.strip() for k in as_list(value) if isinstance(k, str) and k.strip()})
+    return value
+
+
+def profile_key(doc, kind):
+    """按 (规范化姓名, 规范化机构, 邮箱集合) 和所走的流程生成键
+
+    其余输入字段（aminer_id、google_scholar_url、mainpage、honor_track、prize_relations 等）会原样带进补全结果，
+    规整后也计入键，避免不同调用方拿到别人的身份字段
+    """
+    normalized = {'name', 'workplace', 'email'}
+    rest = {}
+    for field, value in doc.items():
+        if field in normalized:
+            continue
+        value = canonical_field(field, value)
+        if value not in (None, '', [], {}):
+            rest[field] = value
+    identity = [kind, pinyin_key(doc.get('name') or ''), affiliation_key(doc.get('workplace')),
+                email_set(doc.get('email')), rest]
+    canonical = json.dumps(identity, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def merge_profile(old, new):
+    # 增量刷新：新结果缺失的字段沿用旧档案
+    merged = dict(old)
+    merged.update({field: value for field, value in new.items() if value not in (None, '', [], {})})
+    return merged
+
+
+class ProfileStore:
+    def __init__(self, path=PROFILE_PATH, mode=PROFILE_MODE, hot_entries=PROFILE_HOT_ENTRIES,
+                 ttl=FRESH_TTL, refresh_after=REFRESH_AFTER):
+        self.path = path
+        self.mode = mode
+        self.hot_entries = hot_entries
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self.hot = OrderedDict()
+        self.hits = 0
+        self.hot_hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.refreshes = 0
+        self._refreshing = set()
+        self._executor = None
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # 连接不能跨进程复用，fork 后重新打开
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS profiles ('
+                'key TEXT PRIMARY KEY, input TEXT, doc TEXT, created REAL, refreshed REAL, version INTEGER)')
+            self._pid = os.getpid()
+            self.hot.clear()
+            self._refreshing.clear()
+            self._executor = None
+        return self._conn
+
+    def _remember(self, key, entry):
+        self.hot[key] = entry
+        self.hot.move_to_end(key)
+        while len(self.hot) > self.hot_entries:
+            self.hot.popitem(last=False)
+
+    def get(self, key):
+        """返回档案记录 {'input', 'doc', 'created', 'refreshed', 'version'}，没有时返回 None"""
+        if self.mode == 'bypass':
+            return None
+        with self._lock:
+            conn = self._connection()
+            entry = self.hot.get(key)
+            if entry is not None:
+                self.hot.move_to_end(key)
+                self.hot_hits += 1
+                return entry
+            row = conn.execute('SELECT input, doc, created, refreshed, version FROM profiles WHERE key = ?',
+                               (key,)).fetchone()
+            if row is None:
+                return None
+            entry = {'input': json.loads(row[0]), 'doc': json.loads(row[1]), 'created': row[2],
+                     'refreshed': row[3], 'version': row[4]}
+            self._remember(key, entry)
+            return entry
+
+    def set(self, key, doc_input, doc, previous=None):
+        if self.mode != 'readwrite':
+            return
+        now = time.time()
+        entry = {
+            'input': doc_input,
+            'doc': doc,
+            'created': previous['created'] if previous else now,
+            'refreshed': now,
+            'version': previous['version'] + 1 if previous else 1,
+        }
+        with self._lock:
+            conn = self._connection()
+            conn.execute('INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?, ?)',
+                         (key, json.dumps(doc_input, ensure_ascii=False), json.dumps(doc, ensure_ascii=False),
+                          entry['created'], entry['refreshed'], entry['version']))
+            conn.commit()
+            self._remember(key, entry)
+
+    def age(self, entry):
+        return time.time() - entry['refreshed']
+
+    def fetch(self, doc, kind, pipeline):
+        """新鲜时直接返回档案，否则调用 pipeline(doc) 并写回；返回 (updated_doc, candidates)"""
+        key = profile_key(doc, kind)
+        entry = self.get(key)
+        if entry is not None and self.age(entry) < self.ttl:
+            self.hits += 1
+            inc('talent_profile_lookups_total', 'Profile store lookups', result='hit')
+            if self.age(entry) >= self.ttl * self.refresh_after:
+                self.schedule_refresh(key, pipeline)
+            # 返回副本，调用方修改不会影响内存中的档案
+            return json.loads(json.dumps(entry['doc'], ensure_ascii=False)), []
+        if entry is None:
+            self.misses += 1
+            inc('talent_profile_lookups_total', 'Profile store lookups', result='miss')
+        else:
+            self.stale += 1
+            inc('talent_profile_lookups_total', 'Profile store lookups', result='stale')
+        doc_input = json.loads(json.dumps(doc, ensure_ascii=False))
+        updated_doc, candidates = pipeline(doc)
+        if updated_doc is not None:
+            self.set(key, doc_input, merge_profile(entry['doc'], updated_doc) if entry else updated_doc, entry)
+        return updated_doc, candidates
+
+    def schedule_refresh(self, key, pipeline):
+        if self.mode != 'readwrite':
+            return
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='profile')
+            executor = self._executor
+        executor.submit(self._refresh, key, pipeline)
+
+    def _refresh(self, key, pipeline):
+        try:
+            entry = self.get(key)
+            if entry is None:
+                return
+            updated_doc, _ = pipeline(json.loads(json.dumps(entry['input'], ensure_ascii=False)))
+            if updated_doc is None:
+                # 这次没找到时保留旧档案，等过期后再同步重跑
+                return
+            self.set(key, entry['input'], merge_profile(entry['doc'], updated_doc), entry)
+            self.refreshes += 1
+        except Exception:
+            logger.exception('profile refresh failed')
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def invalidate(self, doc, kind):
+        key = profile_key(doc, kind)
+        with self._lock:
+            conn = self._connection()
+            self.hot.pop(key, None)
+            conn.execute('DELETE FROM profiles WHERE key = ?', (key,))
+            conn.commit()
+
+    def stats(self):
+        total = self.hits + self.misses + self.stale
+        return {
+            'mode': self.mode,
+            'hits': self.hits,
+            'hot_hits': self.hot_hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'refreshes': self.refreshes,
+            'hot_entries': len(self.hot),
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+_store = None
+
+
+def get_profile_store():
+    global _store
+    if _store is None:
+        _store = ProfileStore()
+    return _store
+
+
+def set_profile_store(store):
+    global _store
+    _store = store
+
+
+def profile_metrics():
+    if _store is None:
+        return []
+    stats = _store.stats()
+    return [
+        ('talent_profile_refreshes_total', 'counter', 'Background profile refreshes', {}, stats['refreshes']),
+        ('talent_profile_hot_entries', 'gauge', 'Profiles held in memory', {}, stats['hot_entries']),
+    ]
+
+
+register_callback(profile_metrics)
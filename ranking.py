@@ -0,0 +1,68 @@
+import os
+import re
+import math
+
+# 搜索结果打分排序：一次正则扫描统计关键词类别覆盖，结合域名优先级、姓名出现和正文长度，
+# 只保留按单个学者调用预算可负担的前 k 条
+CALL_BUDGET = int(os.environ.get('TALENT_CALL_BUDGET', 20))
+CALLS_PER_HIT = 2  # 每条结果最多触发 get_mainpage_info 和 filter_unrelated_info 各一次
+
+priority_substrings = ['.edu', '.aminer', '.scholarmate', '.ac', '.org', '.cas', '.cae']
+keyword_categories = {
+    'education': r'教育背景|学士|硕士|博士|导师|大学|学院|博士后|访问学者|Ph\.?D|Education|University',
+    'work': r'工作经历|研究员|教授|公司|研究所|Professor|Researcher|Experience',
+    'field': r'研究方向|研究领域|研究兴趣|Research Interests?|Research Areas?',
+    'paper': r'论文|著作|出版|发表|Publications?',
+    'honor': r'奖项|荣誉|获奖|称号|Awards?|Honors?',
+}
+keyword_pattern = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in keyword_categories.items()),
+                             re.I)
+
+DOMAIN_WEIGHT = 3.0
+CATEGORY_WEIGHT = 1.0
+NAME_WEIGHT = 2.0
+LENGTH_WEIGHT = 1.0
+
+
+def keyword_coverage(body):
+    return {match.lastgroup for match in keyword_pattern.finditer(body)}
+
+
+def domain_priority(url):
+    return any(substring in (url or '') for substring in priority_substrings)
+
+
+def compact(text):
+    return re.sub(r'\s+', '', text or '').lower()
+
+
+def score_hit(item, name_variants=()):
+    body = item.get('body') or ''
+    coverage = keyword_coverage(body)
+    text = compact(f"{item.get('title') or ''}{body}")
+    has_name = any(compact(variant) in text for variant in name_variants if variant)
+    length = min(1.0, math.log1p(len(body)) / math.log1p(5000))
+    score = (DOMAIN_WEIGHT * domain_priority(item.get('url'))
+             + CATEGORY_WEIGHT * len(coverage)
+             + NAME_WEIGHT * has_name
+             + LENGTH_WEIGHT * length)
+    return score, coverage
+
+
+def budget_top_k(budget=None):
+    budget = CALL_BUDGET if budget is None else budget
+    return max(1, budget // CALLS_PER_HIT)
+
+
+def rank_hits(items, name_variants=(), require_keywords=True, budget=None, truncate=True):
+    """按得分从高到低排序，require_keywords 时丢弃不含任何关键词类别的结果；truncate 为 False 时只排序不截断"""
+    scored = []
+    for position, item in enumerate(items):
+        score, coverage = score_hit(item, name_variants)
+        if require_keywords and not coverage:
+            continue
+        scored.append((-score, position, item))
+    scored.sort(key=lambda entry: entry[:2])
+    if truncate:
+        scored = scored[:budget_top_k(budget)]
+    return [item for _, _, item in scored]
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import logging
+import threading
+from concurrency import ordered_map
+from cluster import name_keys, decision_judge
+from identity import identity_keys
+from name_index import affiliation_key
+
+# 已知学者语料上的倒排索引：强身份字段（aminer_id、google_scholar_url、mainpage、email、荣誉、奖项）
+# 命中即判定为同一学者，其余只在同姓名分块内的少量候选上并发调用 is_same_talent
+logger = logging.getLogger(__name__)
+
+REFERENCE_PATH = os.environ.get('TALENT_REFERENCE_PATH')
+
+
+def load_reference(path):
+    """读取 JSONL 语料，每行一个学者文档；batch_runner 的输出取其 doc 字段"""
+    docs = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'row' in record and 'status' in record:
+                record = record.get('doc')
+            if record:
+                docs.append(record)
+    return docs
+
+
+class ReferenceIndex:
+    def __init__(self, docs=()):
+        self.docs = []
+        self.identity = {}   # 身份键 -> 文档下标集合
+        self.names = {}      # 姓名键 -> [(文档下标, 机构键)]
+        self._lock = threading.Lock()
+        for doc in docs:
+            self.add(doc)
+
+    def add(self, doc):
+        with self._lock:
+            index = len(self.docs)
+            self.docs.append(doc)
+            for key in identity_keys(doc):
+                self.identity.setdefault(key, set()).add(index)
+            workplace = doc.get('workplace')
+            affiliation = affiliation_key(workplace) if workplace else ''
+            for key in name_keys(doc.get('name')):
+                self.names.setdefault(key, []).append((index, affiliation))
+        return index
+
+    def identity_hits(self, doc):
+        hits = set()
+        for key in identity_keys(doc):
+            hits.update(self.identity.get(key, ()))
+        return hits
+
+    def candidates(self, doc):
+        """与 cluster.block_documents 相同的分块规则：姓名键相同，且机构相同或任一方缺少机构"""
+        workplace = doc.get('workplace')
+        affiliation = affiliation_key(workplace) if workplace else ''
+        found = set()
+        for key in name_keys(doc.get('name')):
+            for index, other in self.names.get(key, ()):
+                if not affiliation or not other or affiliation == other:
+                    found.add(index)
+        return found
+
+    def match(self, doc, judge=None, max_workers=None, enrich=None):
+        """返回 (匹配列表, 统计信息)；enrich(doc) 在需要调用大模型前补全 doc，返回 None 时只保留身份字段命中"""
+        decide = decision_judge(judge)
+        started = time.time()
+        hits = self.identity_hits(doc)
+        residual = sorted(self.candidates(doc) - hits)
+        matches = [{'index': i, 'via': 'identity'} for i in sorted(hits)]
+        enriched = doc
+        if residual and enrich is not None:
+            enriched = enrich(doc)
+        llm_calls = 0
+        if residual and enriched is not None:
+            results = ordered_map(lambda i: decide(enriched, self.docs[i]), residual, max_workers)
+            # 评分规则本地判定的候选不计入大模型调用
+            llm_calls = sum(used_llm for _, used_llm in results)
+            matches.extend({'index': i, 'via': 'judge'} for i, (same, _) in zip(residual, results) if same)
+        stats = {
+            'corpus': len(self.docs),
+            'identity_hits': len(hits),
+            'candidates': len(residual),
+            'llm_calls': llm_calls,
+            'elapsed': round(time.time() - started, 3),
+        }
+        return matches, stats
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_reference_index():
+    """首次调用时从 TALENT_REFERENCE_PATH 加载语料，未配置时返回 None"""
+    global _index
+    if _index is None and REFERENCE_PATH:
+        with _index_lock:
+            if _index is None:
+                docs = load_reference(REFERENCE_PATH)
+                _index = ReferenceIndex(docs)
+                logger.info('loaded %d reference documents from %s', len(docs), REFERENCE_PATH)
+    return _index
+
+
+def set_reference_index(index):
+    global _index
+    _index = index
@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from functools import wraps
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import httpx
+from metrics import inc
+
+# 每个 endpoint 独立的重试、对冲请求和熔断策略
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLICY = {
+    'retries': 2,            # 可重试失败的最大重试次数
+    'backoff_base': 0.5,     # 指数退避起始秒数
+    'backoff_max': 8.0,
+    'hedge': True,           # 超过观测到的 p95 后发送一次重复请求
+    'hedge_min_samples': 20,
+    'breaker_failures': 5,   # 连续失败多少次后熔断
+    'breaker_reset': 30.0,   # 熔断后多少秒允许试探请求
+}
+POLICIES = {
+    'search': {**DEFAULT_POLICY, 'retries': 3, 'backoff_base': 0.3},
+    'gpt': {**DEFAULT_POLICY},
+    'chat': {**DEFAULT_POLICY},
+    'hyaide': {**DEFAULT_POLICY, 'hedge': False},
+}
+LATENCY_WINDOW = 200
+HEDGE_POOL_SIZE = 100
+
+
+class EndpointError(Exception):
+    pass
+
+
+class CircuitOpenError(EndpointError):
+    pass
+
+
+def configure_resilience(endpoint, **policy):
+    POLICIES.setdefault(endpoint, dict(DEFAULT_POLICY)).update(policy)
+
+
+def is_retryable(error):
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    # 网络错误、超时，以及错误页导致的 JSON 解析失败
+    return isinstance(error, (httpx.TransportError, json.JSONDecodeError))
+
+
+def is_endpoint_failure(error):
+    """重试耗尽或熔断导致的失败"""
+    return isinstance(error, EndpointError) or is_retryable(error)
+
+
+def degrade_on_failure(stage, default=None):
+    """重试耗尽或熔断时记录告警并返回 default（可调用时返回其调用结果），只放弃这一步而不中断整个文档"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_endpoint_failure(e):
+                    raise
+                logger.warning('%s failed: %s', stage, e)
+                inc('talent_degraded_calls_total', 'Calls that degraded to an empty result', stage=stage)
+                return default() if callable(default) else default
+        return wrapper
+    return decorator
+
+
+class LatencyTracker:
+    def __init__(self, size=LATENCY_WINDOW):
+        self.samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, latency):
+        with self._lock:
+            self.samples.append(latency)
+
+    def median(self):
+        with self._lock:
+            if not self.samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[len(ordered) // 2]
+
+    def p95(self, min_samples):
+        with self._lock:
+            if len(self.samples) < min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class CircuitBreaker:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        policy = POLICIES.get(self.endpoint, DEFAULT_POLICY)
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= policy['breaker_reset'] and not self.trial_in_flight:
+                self.trial_in_flight = True  # 半开状态，只放行一个试探请求
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def release(self):
+        # 非可重试错误（如 4xx）说明不了 endpoint 是否健康：不计成功也不计失败，只归还试探名额
+        with self._lock:
+            self.trial_in_flight = False
+
+    def failure(self):
+        policy = POLICIES.get(self.endpoint, DEFAULT_POLICY)
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= policy['breaker_failures']:
+                if self.opened_at is None:
+                    logger.warning('circuit opened for endpoint %s', self.endpoint)
+                    inc('talent_circuit_open_total', 'Circuit breaker trips', endpoint=self.endpoint)
+                self.opened_at = time.monotonic()
+
+
+_trackers = {}
+_breakers = {}
+_state_lock = threading.Lock()
+_hedge_pool = None
+_hedge_pid = None
+
+
+def _state(endpoint):
+    with _state_lock:
+        if endpoint not in _trackers:
+            _trackers[endpoint] = LatencyTracker()
+            _breakers[endpoint] = CircuitBreaker(endpoint)
+        return _trackers[endpoint], _breakers[endpoint]
+
+
+def _pool():
+    # fork 出的子进程里父进程的线程不存在，需要重建线程池
+    global _hedge_pool, _hedge_pid
+    with _state_lock:
+        if _hedge_pool is None or _hedge_pid != os.getpid():
+            _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_POOL_SIZE, thread_name_prefix='hedge')
+            _hedge_pid = os.getpid()
+        return _hedge_pool
+
+
+def endpoint_latency(endpoint):
+    """最近成功请求的延迟中位数，尚无样本时返回 None"""
+    return _state(endpoint)[0].median()
+
+
+def backoff_delay(endpoint, attempt):
+    policy = POLICIES.get(endpoint, DEFAULT_POLICY)
+    ceiling = min(policy['backoff_max'], policy['backoff_base'] * 2 ** attempt)
+    return random.uniform(0, ceiling)  # full jitter
+
+
+def _hedged(endpoint, send, hedge_after):
+    """先发主请求，超过 hedge_after 秒仍未返回时再发一次，取先成功的结果"""
+    pool = _pool()
+    futures = {pool.submit(send)}
+    finished, _ = wait(futures, timeout=hedge_after)
+    if not finished:
+        inc('talent_hedged_requests_total', 'Hedged duplicate requests sent', endpoint=endpoint)
+        futures.add(pool.submit(send))
+    error = None
+    pending = futures
+    while pending:
+        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in finished:
+            try:
+                return future.result()
+            except Exception as e:
+                error = e
+    raise error
+
+
+def call_with_resilience(endpoint, send):
+    policy = POLICIES.get(endpoint, DEFAULT_POLICY)
+    tracker, breaker = _state(endpoint)
+    for attempt in range(policy['retries'] + 1):
+        if not breaker.allow():
+            inc('talent_circuit_rejected_total', 'Calls rejected by an open circuit', endpoint=endpoint)
+            raise CircuitOpenError(f'circuit open for endpoint {endpoint}')
+        hedge_after = tracker.p95(policy['hedge_min_samples']) if policy['hedge'] else None
+        started = time.monotonic()
+        try:
+            result = _hedged(endpoint, send, hedge_after) if hedge_after is not None else send()
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.release()
+                raise
+            breaker.failure()
+            if attempt >= policy['retries']:
+                raise
+            inc('talent_retries_total', 'Retried endpoint calls', endpoint=endpoint)
+            time.sleep(backoff_delay(endpoint, attempt))
+            continue
+        tracker.add(time.monotonic() - started)
+        breaker.success()
+        return result
+
+
+async def _ahedged(endpoint, send, hedge_after):
+    tasks = {asyncio.ensure_future(send())}
+    done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+    if not done:
+        inc('talent_hedged_requests_total', 'Hedged duplicate requests sent', endpoint=endpoint)
+        tasks.add(asyncio.ensure_future(send()))
+    error = None
+    pending = tasks
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def acall_with_resilience(endpoint, send):
+    policy = POLICIES.get(endpoint, DEFAULT_POLICY)
+    tracker, breaker = _state(endpoint)
+    for attempt in range(policy['retries'] + 1):
+        if not breaker.allow():
+            inc('talent_circuit_rejected_total', 'Calls rejected by an open circuit', endpoint=endpoint)
+            raise CircuitOpenError(f'circuit open for endpoint {endpoint}')
+        hedge_after = tracker.p95(policy['hedge_min_samples']) if policy['hedge'] else None
+        started = time.monotonic()
+        try:
+            if hedge_after is not None:
+                result = await _ahedged(endpoint, send, hedge_after)
+            else:
+                result = await send()
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.release()
+                raise
+            breaker.failure()
+            if attempt >= policy['retries']:
+                raise
+            inc('talent_retries_total', 'Retried endpoint calls', endpoint=endpoint)
+            await asyncio.sleep(backoff_delay(endpoint, attempt))
+            continue
+        tracker.add(time.monotonic() - started)
+        breaker.success()
+        return result
@@ -0,0 +1,201 @@
+import os
+import re
+import json
+import logging
+import threading
+from collections import deque
+from get_talent_doc import is_same_talent, name_to_pinyin
+from identity import load_track, as_list
+from name_index import affiliation_key
+from metrics import register_callback
+
+# is_same_talent 提示词中评分规则的本地实现：
+# workplace 2 分，education_track 每条同校同学位 3 分，professional_track 每条同单位同职称 3 分，
+# keywords 相似度 1-4 分，达到 7 分判定为同一学者；只有落在不确定区间的分数才交给大模型
+logger = logging.getLogger(__name__)
+
+THRESHOLD = 7
+ACCEPT_SCORE = int(os.environ.get('TALENT_RUBRIC_ACCEPT', 9))
+REJECT_SCORE = int(os.environ.get('TALENT_RUBRIC_REJECT', 3))
+AUDIT_SIZE = 1000
+
+DEGREES = [
+    ('postdoc', ['博士后', 'postdoc', 'post-doc', 'postdoctoral']),
+    ('phd', ['博士', 'phd', 'ph.d', 'doctor', 'doctoral']),
+    ('master', ['硕士', 'master', 'm.s', 'msc', 'm.sc', 'mphil']),
+    ('bachelor', ['学士', '本科', 'bachelor', 'b.s', 'bsc', 'b.sc', 'b.e', 'b.eng']),
+]
+TITLES = [
+    ('assistant professor', ['助理教授', 'assistant professor']),
+    ('associate professor', ['副教授', 'associate professor']),
+    ('professor', ['教授', 'professor', 'prof']),
+    ('associate researcher', ['副研究员', 'associate researcher', 'associate research fellow']),
+    ('researcher', ['研究员', 'researcher', 'research fellow']),
+    ('lecturer', ['讲师', 'lecturer']),
+    ('postdoc', ['博士后', 'postdoc', 'postdoctoral']),
+]
+
+cjk_pattern = re.compile(r'[一-龥]')
+
+audit_log = deque(maxlen=AUDIT_SIZE)
+stats = {'local_accept': 0, 'local_reject': 0, 'llm': 0}
+_stats_lock = threading.Lock()
+
+
+def canonical_term(value, table):
+    if not value or not isinstance(value, str):
+        return None
+    text = value.strip().lower()
+    for canonical, variants in table:
+        if any(variant in text for variant in variants):
+            return canonical
+    return text
+
+
+def same_place(a, b):
+    if not a or not b or not isinstance(a, str) or not isinstance(b, str):
+        return False
+    # 比较机构词典的规范名，子串包含会把"北京大学"和"北京大学医学部"这类不同单位当成同一个
+    key_a = affiliation_key(a)
+    return bool(key_a) and key_a == affiliation_key(b)
+
+
+def name_forms(name):
+    """姓名的拼音写法集合（去掉空格和连字符，姓名两种顺序都算）"""
+    if not name or not isinstance(name, str):
+        return set()
+    if cjk_pattern.search(name):
+        tokens = name_to_pinyin(name.strip())[0].lower().split()
+    else:
+        tokens = [t for t in re.split(r'[^a-z]+', name.lower()) if t]
+    if not tokens:
+        return set()
+    return {''.join(tokens), ''.join(reversed(tokens))}
+
+
+def same_name(a, b):
+    """两个中文名要求完全相同，否则比较拼音写法"""
+    if not isinstance(a, str) or not isinstance(b, str):
+        return False
+    if cjk_pattern.search(a) and cjk_pattern.search(b):
+        return a.strip() == b.strip()
+    return bool(name_forms(a) & name_forms(b))
+
+
+def match_records(track1, track2, place_field, role_field, role_table):
+    """每条记录最多与对方一条记录配对，返回配对数"""
+    used = set()
+    matched = 0
+    for r1 in track1:
+        if not isinstance(r1, dict):
+            continue
+        role1 = canonical_term(r1.get(role_field), role_table)
+        for j, r2 in enumerate(track2):
+            if j in used or not isinstance(r2, dict):
+                continue
+            if role1 and role1 == canonical_term(r2.get(role_field), role_table) \
+                    and same_place(r1.get(place_field), r2.get(place_field)):
+                used.add(j)
+                matched += 1
+                break
+    return matched
+
+
+def bigram_vectors(texts_a, texts_b):
+    import numpy as np  # 只在比较关键词时用到，延迟导入以加快服务启动
+    def grams(text):
+        text = re.sub(r'\s+', ' ', text.lower()).strip()
+        return [text[i:i + 2] for i in range(len(text) - 1)] or [text]
+
+    grams_a = [g for t in texts_a for g in grams(t)]
+    grams_b = [g for t in texts_b for g in grams(t)]
+    vocabulary = {g: i for i, g in enumerate(dict.fromkeys(grams_a + grams_b))}
+    vectors = np.zeros((2, len(vocabulary)))
+    np.add.at(vectors[0], [vocabulary[g] for g in grams_a], 1)
+    np.add.at(vectors[1], [vocabulary[g] for g in grams_b], 1)
+    return vectors
+
+
+def keyword_similarity(keywords1, keywords2):
+    keywords1 = [k for k in as_list(keywords1) if isinstance(k, str) and k.strip()]
+    keywords2 = [k for k in as_list(keywords2) if isinstance(k, str) and k.strip()]
+    if not keywords1 or not keywords2:
+        return None
+    import numpy as np
+    vectors = bigram_vectors(keywords1, keywords2)
+    norms = np.linalg.norm(vectors, axis=1)
+    if not norms.all():
+        return 0.0
+    return float(vectors[0] @ vectors[1] / (norms[0] * norms[1]))
+
+
+def score_pair(doc1, doc2):
+    """按评分规则给出各项得分明细"""
+    education1, education2 = load_track(doc1.get('education_track')), load_track(doc2.get('education_track'))
+    professional1, professional2 = load_track(doc1.get('professional_track')), load_track(doc2.get('professional_track'))
+    similarity = keyword_similarity(doc1.get('keywords'), doc2.get('keywords'))
+
+    breakdown = {
+        'workplace': 2 if same_place(doc1.get('workplace'), doc2.get('workplace')) else 0,
+        'education_track': 3 * match_records(education1, education2, 'school', 'scholar', DEGREES),
+        'professional_track': 3 * match_records(professional1, professional2, 'agency', 'title', TITLES),
+        'keywords': 0 if similarity is None else int(min(4, round(similarity * 4))),
+        'keyword_similarity': similarity,
+    }
+    breakdown['same_name'] = same_name(doc1.get('name'), doc2.get('name'))
+    breakdown['score'] = (breakdown['workplace'] + breakdown['education_track']
+                          + breakdown['professional_track'] + breakdown['keywords'])
+    # 双方都有履历和关键词时，低分才足以本地否决
+    breakdown['comparable'] = bool((education1 or professional1) and (education2 or professional2)
+                                   and similarity is not None)
+    return breakdown
+
+
+def local_verdict(breakdown, accept_score=None, reject_score=None):
+    """True/False 为本地判定，None 表示落在不确定区间"""
+    accept_score = ACCEPT_SCORE if accept_score is None else accept_score
+    reject_score = REJECT_SCORE if reject_score is None else reject_score
+    # 姓名（或拼音）不一致时，履历分数再高也不在本地判定为同一人
+    if breakdown['score'] >= accept_score and breakdown.get('same_name'):
+        return True
+    if breakdown['comparable'] and breakdown['score'] <= reject_score:
+        return False
+    return None
+
+
+def decide_same_talent(doc1, doc2, accept_score=None, reject_score=None):
+    """返回 (与 is_same_talent 格式相同的答案, 是否调用了大模型)"""
+    breakdown = score_pair(doc1, doc2)
+    verdict = local_verdict(breakdown, accept_score, reject_score)
+    decision = {True: 'local_accept', False: 'local_reject', None: 'llm'}[verdict]
+    with _stats_lock:
+        stats[decision] += 1
+    if verdict is None:
+        word = is_same_talent(doc1, doc2)
+    else:
+        word = 'True' if verdict else 'False'
+    breakdown['decided_by'] = 'llm' if verdict is None else 'rubric'
+    breakdown['result'] = word
+    breakdown['names'] = [doc1.get('name'), doc2.get('name')]
+    audit_log.append(breakdown)
+    logger.debug('rubric score: %s', json.dumps(breakdown, ensure_ascii=False))
+    return word, verdict is None
+
+
+def judge_same_talent(doc1, doc2, accept_score=None, reject_score=None):
+    """与 is_same_talent 返回格式相同，只有不确定时才调用大模型"""
+    return decide_same_talent(doc1, doc2, accept_score, reject_score)[0]
+
+
+def recent_scores(n=100):
+    return list(audit_log)[-n:]
+
+
+def rubric_metrics():
+    with _stats_lock:
+        snapshot = dict(stats)
+    return [('talent_rubric_decisions_total', 'counter', 'Same-talent decisions by decider',
+             {'decision': decision}, count) for decision, count in snapshot.items()]
+
+
+register_callback(rubric_metrics)
@@ -0,0 +1,259 @@
+import os
+import gc
+import sys
+import json
+import time
+import socket
+import signal
+import select
+import logging
+import argparse
+from collections import deque
+
+STARTED = time.perf_counter()
+
+# 生产环境的预派生（pre-fork）服务：主进程导入应用并预热拼音词典、机构词典、姓名索引和参考语料，
+# 然后 fork 出多个 worker 共享同一个监听 socket。预热后的状态通过写时复制在 worker 间共享，
+# 每个 worker 不必重复导入和加载。连接池、SQLite 连接和线程池都按 pid 在 worker 内重新创建
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.environ.get('TALENT_WORKERS', os.cpu_count() or 1))
+# worker 崩溃后按指数退避重启；CRASH_WINDOW 秒内崩溃超过 CRASH_BUDGET 次时主进程停止全部 worker 并退出
+RESTART_BACKOFF = float(os.environ.get('TALENT_RESTART_BACKOFF', 0.5))
+RESTART_BACKOFF_MAX = float(os.environ.get('TALENT_RESTART_BACKOFF_MAX', 30.0))
+CRASH_BUDGET = int(os.environ.get('TALENT_CRASH_BUDGET', 10))
+CRASH_WINDOW = float(os.environ.get('TALENT_CRASH_WINDOW', 60.0))
+# 主进程等待首批 worker 报告就绪的最长时间，超时后按已就绪的 worker 输出启动报告
+READY_TIMEOUT = float(os.environ.get('TALENT_READY_TIMEOUT', 60.0))
+
+
+def memory(pid='self'):
+    """进程内存（字节）：rss 含与主进程共享的页面，pss 按共享进程数分摊，private 为 worker 独占的部分"""
+    usage = {'rss': None, 'pss': None, 'private': None}
+    fields = {'Rss:': 'rss', 'Pss:': 'pss', 'Private_Clean:': 'private', 'Private_Dirty:': 'private'}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', encoding='ascii') as f:
+            for line in f:
+                parts = line.split()
+                key = fields.get(parts[0]) if parts else None
+                if key:
+                    usage[key] = (usage[key] or 0) + int(parts[1]) * 1024
+    except OSError:
+        if pid == 'self':
+            import resource
+            scale = 1 if sys.platform == 'darwin' else 1024
+            usage['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    return usage
+
+
+def megabytes(value):
+    return None if value is None else round(value / 2 ** 20, 1)
+
+
+def warm_state():
+    """导入应用并加载各进程共享的只读状态，返回各步骤耗时"""
+    timings = {}
+    started = time.perf_counter()
+    import compare_test
+    timings['import'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    from get_talent_doc import name_to_pinyin
+    from name_extract import extract_chinese_name
+    from gazetteer import get_gazetteer
+    from name_index import get_name_index
+    from reference_index import get_reference_index
+    import uvicorn
+    import transport
+    # 首次调用会加载拼音词典、机构词典、CA 证书和 httpx 的延迟导入
+    name_to_pinyin('张三')
+    extract_chinese_name([{'url': '', 'title': '张三', 'body': '张三 清华大学'}], 'San Zhang')
+    get_gazetteer().resolve('Tsinghua Univ')
+    get_name_index()
+    get_reference_index()
+    transport.get_client()
+    timings['warm'] = time.perf_counter() - started
+    return compare_test.app, timings
+
+
+def bind_socket(host, port, backlog=2048):
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock, index, log_level, ready=None):
+    import uvicorn
+    import transport
+    from metrics import register_callback
+
+    forked = time.perf_counter()
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    transport.get_client()  # 每个 worker 各自的连接池
+    started = {'at': None}
+
+    def gauges():
+        samples = [('talent_process_memory_bytes', 'gauge', 'Memory of this worker by kind',
+                    {'worker': index, 'kind': kind}, value)
+                   for kind, value in memory().items() if value is not None]
+        if started['at'] is not None:
+            samples.append(('talent_process_startup_seconds', 'gauge', 'Seconds from server start to worker ready',
+                            {'worker': index}, round(started['at'] - STARTED, 3)))
+        return samples
+
+    register_callback(gauges)
+
+    class Server(uvicorn.Server):
+        async def startup(self, sockets=None):
+            await super().startup(sockets=sockets)
+            if not self.started:
+                return
+            # uvicorn 完成 lifespan 启动并开始接受连接后才算就绪，再通过管道通知主进程
+            started['at'] = time.perf_counter()
+            usage = memory()
+            logger.info('worker %d (pid %d) ready in %.3fs after fork, rss %s MB, private %s MB',
+                        index, os.getpid(), started['at'] - forked, megabytes(usage['rss']),
+                        megabytes(usage['private']))
+            if ready is not None:
+                try:
+                    os.write(ready, b'.')
+                except OSError:
+                    pass
+                finally:
+                    os.close(ready)
+
+    config = uvicorn.Config(app, log_level=log_level, access_log=False)
+    Server(config).run(sockets=[sock])
+
+
+def spawn(app, sock, index, log_level, ready=None):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app, sock, index, log_level, ready)
+        except Exception:
+            logger.exception('worker %d crashed', index)
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def wait_ready(fd, count, timeout=READY_TIMEOUT):
+    """读取 worker 写入就绪管道的字节，直到 count 个 worker 全部就绪或超时，返回已就绪的数量"""
+    deadline = time.monotonic() + timeout
+    seen = 0
+    while seen < count:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning('only %d of %d workers ready after %.0fs', seen, count, timeout)
+            break
+        try:
+            readable, _, _ = select.select([fd], [], [], remaining)
+        except InterruptedError:
+            continue
+        if not readable:
+            continue
+        data = os.read(fd, count - seen)
+        if not data:
+            # 所有写端都已关闭：剩下的 worker 在就绪前就退出了
+            logger.warning('only %d of %d workers ready, the rest exited during startup', seen, count)
+            break
+        seen += len(data)
+    return seen
+
+
+def report(workers, timings):
+    usage = {pid: memory(pid) for pid in workers}
+    summary = {
+        'import_seconds': round(timings['import'], 3),
+        'warm_seconds': round(timings['warm'], 3),
+        'startup_seconds': round(time.perf_counter() - STARTED, 3),
+        'master_rss_mb': megabytes(memory()['rss']),
+        'workers': {pid: {kind: megabytes(value) for kind, value in u.items()} for pid, u in usage.items()},
+        'total_worker_private_mb': megabytes(sum(u['private'] or 0 for u in usage.values())),
+    }
+    logger.info('startup: %s', json.dumps(summary))
+    return summary
+
+
+def serve(host='0.0.0.0', port=8000, workers=WORKERS, log_level='info'):
+    app, timings = warm_state()
+    sock = bind_socket(host, port)
+    # 把预热后的对象移出 GC 跟踪，避免 worker 里的垃圾回收触碰共享页面导致写时复制
+    gc.collect()
+    gc.freeze()
+    # 首批 worker 就绪后各写一个字节，主进程据此在真正可服务时输出启动报告
+    ready_read, ready_write = os.pipe()
+    children = {spawn(app, sock, index, log_level, ready_write): index for index in range(workers)}
+    os.close(ready_write)
+    logger.info('listening on %s:%d with %d workers', host, port, workers)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    wait_ready(ready_read, workers)
+    os.close(ready_read)
+    report(children, timings)
+
+    crashes = deque()
+    code = 0
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        now = time.monotonic()
+        crashes.append(now)
+        while crashes and now - crashes[0] > CRASH_WINDOW:
+            crashes.popleft()
+        if len(crashes) > CRASH_BUDGET:
+            # 持续崩溃（例如配置错误）时不再重启，交给外部的进程管理器处理
+            logger.error('%d worker crashes within %.0fs, shutting down', len(crashes), CRASH_WINDOW)
+            code = 1
+            stop(None, None)
+            continue
+        # worker 意外退出时等待一段退避时间，再用同一编号补一个
+        delay = min(RESTART_BACKOFF_MAX, RESTART_BACKOFF * 2 ** (len(crashes) - 1))
+        logger.warning('worker %d (pid %d) exited with status %d, restarting in %.1fs', index, pid, status, delay)
+        time.sleep(delay)
+        if not stopping:
+            children[spawn(app, sock, index, log_level)] = index
+    sock.close()
+    return code
+
+
+def main():
+    parser = argparse.ArgumentParser(description='预派生多进程的学者比较服务')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper())
+    sys.exit(serve(args.host, args.port, args.workers, args.log_level))
+
+
+if __name__ == '__main__':
+    main()
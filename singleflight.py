@@ -0,0 +1,114 @@
+import json
+import asyncio
+import threading
+from metrics import inc, register_callback
+
+# 进程内的请求合并：相同的请求正在进行时，后来的调用者等待并共享第一个请求的结果或异常，
+# 线程和 asyncio 各自维护一份进行中的表：同一个 key 的同步调用和协程调用之间不会合并，
+# 各自最多发出一个请求（同步路径在线程里阻塞等待，不能与事件循环里的 future 互相等待）
+
+
+def flight_key(endpoint, payload):
+    return endpoint, json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def _count(self, leader, label):
+        if leader:
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+            inc('talent_coalesced_calls_total', 'Calls that shared an in-flight request', kind=label)
+
+    def do(self, key, func, label='none'):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._count(leader, label)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def ado(self, key, func, label='none'):
+        """func 返回协程；同一事件循环内的相同 key 共享一个任务
+
+        请求在独立的任务里执行，不属于任何调用者：发起者被取消时请求继续，其他等待者照常拿到结果
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            leader = task is None
+            if leader:
+                task = tasks[key] = loop.create_task(func())
+                task.add_done_callback(lambda t: self._finish(loop, key, t))
+            self._count(leader, label)
+        # shield 保证某个调用者被取消时不会取消共享的任务
+        return await asyncio.shield(task)
+
+    def _finish(self, loop, key, task):
+        with self._lock:
+            tasks = self._tasks.get(loop, {})
+            if tasks.get(key) is task:
+                tasks.pop(key)
+            if not tasks:
+                self._tasks.pop(loop, None)
+        if not task.cancelled():
+            task.exception()  # 所有调用者都已取消时避免 "exception was never retrieved"
+
+    def stats(self):
+        total = self.leaders + self.coalesced
+        return {
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'coalesced_rate': self.coalesced / total if total else 0.0,
+        }
+
+
+_flight = SingleFlight()
+
+
+def get_flight():
+    return _flight
+
+
+def do(key, func, label='none'):
+    return _flight.do(key, func, label)
+
+
+async def ado(key, func, label='none'):
+    return await _flight.ado(key, func, label)
+
+
+register_callback(lambda: [
+    ('talent_singleflight_leaders_total', 'counter', 'Requests actually sent by single-flight', {},
+     _flight.leaders),
+])
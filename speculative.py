@@ -0,0 +1,86 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from metrics import inc
+
+# 推测执行：把原本串行的兜底分支同时启动，按优先级取第一个成功的结果，其余取消或丢弃。
+# SPECULATIVE_MAX_BRANCHES 限制同时在跑的分支数，低优先级分支只有在有空位且仍需要时才会启动；
+# SPECULATIVE_HEDGE_DELAY 为相邻两个分支启动的最小间隔，前面的分支在这段时间内成功就不必再启动后面的
+logger = logging.getLogger(__name__)
+
+SPECULATIVE = os.environ.get('TALENT_SPECULATIVE', '0') == '1'
+SPECULATIVE_MAX_BRANCHES = int(os.environ.get('TALENT_SPECULATIVE_MAX_BRANCHES', 2))
+SPECULATIVE_HEDGE_DELAY = float(os.environ.get('TALENT_SPECULATIVE_HEDGE_DELAY', 0))
+
+
+def first_success(branches, accept, max_branches=None, hedge_delay=None):
+    """branches 为按优先级排列的无参函数，返回 (胜出下标, 各分支结果)
+
+    分支按优先级依次启动：同时在跑的不超过 max_branches 个，相邻两次启动至少间隔 hedge_delay 秒
+    （前面的分支都已结束时立即启动），已有分支成功后不再启动更低优先级的分支，正在跑的也被取消或丢弃。
+    只有当更高优先级的分支都已结束且未成功时，才采用某个成功分支的结果；
+    都不成功时与串行执行一致，返回最后一个分支的结果，若有分支抛出异常则抛出优先级最高的异常。
+    """
+    max_branches = max(1, max_branches or SPECULATIVE_MAX_BRANCHES)
+    hedge_delay = SPECULATIVE_HEDGE_DELAY if hedge_delay is None else hedge_delay
+    results = [None] * len(branches)
+    errors = [None] * len(branches)
+    accepted = [False] * len(branches)
+    done = [False] * len(branches)
+    futures = {}
+    pending = set()
+    launched = 0
+    last_launch = 0.0
+    discarded = 0
+    executor = ThreadPoolExecutor(max_workers=max_branches)
+    try:
+        while True:
+            for index in range(launched):
+                if not done[index]:
+                    break
+                if accepted[index]:
+                    inc('talent_speculative_wins_total', 'Speculative executions by winning branch',
+                        branch=str(index))
+                    discarded += sum(1 for f in pending if not f.cancel())
+                    if discarded:
+                        inc('talent_speculative_discarded_total', 'Speculative branches whose result was discarded',
+                            value=discarded)
+                    return index, results
+            else:
+                if launched == len(branches):
+                    break
+            # 已有分支成功时，优先级更低的分支不必启动，正在跑的结果也用不上
+            best = next((index for index in range(launched) if accepted[index]), None)
+            if best is not None:
+                for future in [f for f in pending if futures[f] > best]:
+                    pending.discard(future)
+                    if not future.cancel():
+                        discarded += 1
+            timeout = None
+            while best is None and launched < len(branches) and len(pending) < max_branches:
+                waited = time.monotonic() - last_launch
+                if pending and waited < hedge_delay:
+                    timeout = hedge_delay - waited
+                    break
+                future = executor.submit(branches[launched])
+                futures[future] = launched
+                pending.add(future)
+                launched += 1
+                last_launch = time.monotonic()
+            finished, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index = futures[future]
+                done[index] = True
+                try:
+                    results[index] = future.result()
+                    accepted[index] = accept(results[index])
+                except Exception as e:
+                    errors[index] = e
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for error in errors:
+        if error is not None:
+            raise error
+    return len(branches) - 1, results
@@ -0,0 +1,208 @@
+import re
+import json
+import time
+import random
+import argparse
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cache import cache_key
+
+# search / gpt3 / chat / app_create 的本地替身服务：优先回放录制的响应，否则按提示词生成合成响应，
+# 可按 endpoint 注入延迟和错误率，用于无网络环境下的基准测试
+logger = logging.getLogger(__name__)
+
+PATHS = {
+    '/search': 'search',
+    '/gpt3': 'gpt',
+    '/chat': 'chat',
+    '/openapi/app_platform/app_create': 'hyaide',
+}
+item_pattern = re.compile(r'\{"url": "(.*?)", "title": "(.*?)", "body": "(.*?)"\}')
+numbered_item_pattern = re.compile(r'^\[(\d+)\] item=', re.M)
+
+
+class StandinConfig:
+    def __init__(self, latency=None, jitter=0.2, error_rate=0.0, fixtures=None, hits=10, seed=None, confidence=90):
+        self.latency = latency or {}
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fixtures = fixtures or {}
+        self.hits = hits
+        self.confidence = confidence  # 模型级联提示词中快模型报告的置信度
+        self.random = random.Random(seed)
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    def delay(self, endpoint):
+        base = self.latency.get(endpoint, 0.0)
+        if base <= 0:
+            return 0.0
+        with self._lock:
+            return base * (1 + self.random.uniform(-self.jitter, self.jitter))
+
+    def should_fail(self):
+        with self._lock:
+            return self.random.random() < self.error_rate
+
+    def count(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+
+def load_fixtures(path):
+    """读取 transport 录制的 JSONL（TALENT_RECORD_PATH），按 endpoint + payload 建索引"""
+    fixtures = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            fixtures[cache_key(record['endpoint'], record['payload'])] = record['response']
+    return fixtures
+
+
+def query_name(text):
+    head = re.split(r'[，,]', text or '', maxsplit=1)[0]
+    return head.replace('教师', '').replace('请搜索姓名为', '').strip() or '张三'
+
+
+def synthetic_hits(text, n):
+    name = query_name(text)
+    hits = []
+    for i in range(n):
+        body = (f'{name}，中山大学教授，博士生导师。教育背景：2005年于北京大学获博士学位。'
+                f'研究方向为肿瘤放射治疗与鼻咽癌综合治疗，发表SCI论文{50 + i}篇，获国家科技进步奖。') * (1 + i % 3)
+        hits.append({
+            'url': f'http://faculty{i}.example.edu.cn/{name}',
+            'link': f'http://faculty{i}.example.edu.cn/{name}',
+            'title': f'{name} - 中山大学个人主页',
+            'body': body,
+        })
+    return hits
+
+
+def synthetic_summary():
+    return json.dumps({
+        'name': 'null',
+        'email': [],
+        'workplace': '中山大学',
+        'education_track': [{'school': '北京大学', 'scholar': '博士', 'time': '2005'}],
+        'professional_track': [{'agency': '中山大学', 'title': '教授', 'time': '2010'}],
+        'honor_track': [],
+        'keywords': ['鼻咽癌', '放射治疗'],
+    }, ensure_ascii=False)
+
+
+def synthetic_answer(text):
+    if 'numbered items' in text:
+        count = len(numbered_item_pattern.findall(text))
+        return '\n'.join(f'{i}: True' for i in range(1, count + 1))
+    if '工作地点workplace' in text:
+        return '中山大学'
+    if '高等院校' in text:
+        return 'True'
+    if '学者数量' in text:
+        return f'学者数量==1\n{query_name(text)}，中山大学教授，研究方向为鼻咽癌。'
+    if '去重' in text:
+        match = item_pattern.search(text)
+        return match.group(0) if match else 'None'
+    if 'Chinese name matches' in text or 'Chinese character name' in text:
+        return 'Not Found'
+    return 'True'
+
+
+def synthetic_response(endpoint, payload, config):
+    if endpoint == 'search':
+        return synthetic_hits(payload.get('text'), config.hits)
+    if endpoint == 'hyaide':
+        if payload.get('forward_service') == 'hyaide-application-4745':
+            return {'result': synthetic_summary()}
+        return {'result': '中山大学教授，研究方向为鼻咽癌。' * 20}
+    answer = synthetic_answer(payload.get('text', ''))
+    if 'Confidence: <0-100>' in payload.get('text', ''):
+        answer += f'\nConfidence: {config.confidence}'
+    return {'data': {'gpt': answer}}
+
+
+class StandinHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def make_handler(config):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+        def _send(self, status, body, content_type='application/json'):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            raw = self.rfile.read(length)
+            endpoint = PATHS.get(self.path)
+            if endpoint is None:
+                self._send(404, '{"error": "not found"}')
+                return
+            config.count(endpoint)
+            time.sleep(config.delay(endpoint))
+            if config.should_fail():
+                self._send(500, '<html>Internal Server Error</html>', 'text/html')
+                return
+            payload = json.loads(raw or b'{}')
+            key = cache_key(endpoint, payload)
+            response = config.fixtures[key] if key in config.fixtures else synthetic_response(endpoint, payload, config)
+            self._send(200, json.dumps(response, ensure_ascii=False))
+
+    return Handler
+
+
+def start_server(config=None, host='127.0.0.1', port=0):
+    """在后台线程启动替身服务，返回 (server, base_url)"""
+    config = config or StandinConfig()
+    server = StandinHTTPServer((host, port), make_handler(config))
+    server.config = config
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def parse_latency(value):
+    """'search=0.3,gpt=1.2' -> {'search': 0.3, 'gpt': 1.2}"""
+    latency = {}
+    for part in (value or '').split(','):
+        if '=' in part:
+            endpoint, seconds = part.split('=', 1)
+            latency[endpoint.strip()] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description='search/gpt/chat/hyaide 替身服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', default='', help='例如 search=0.3,gpt=1.2,chat=0.8,hyaide=2')
+    parser.add_argument('--jitter', type=float, default=0.2)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--fixtures', default=None, help='TALENT_RECORD_PATH 录制的 JSONL')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--confidence', type=int, default=90, help='快模型回答的置信度，低于阈值时会升级到 gpt4o')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = StandinConfig(parse_latency(args.latency), args.jitter, args.error_rate,
+                           load_fixtures(args.fixtures) if args.fixtures else None, seed=args.seed,
+                           confidence=args.confidence)
+    server = StandinHTTPServer((args.host, args.port), make_handler(config))
+    logger.info('stand-in listening on http://%s:%d', args.host, args.port)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
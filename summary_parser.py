@@ -0,0 +1,215 @@
+import re
+import json
+import logging
+from metrics import inc
+
+# summary_info 输出的解析：先严格 json.loads，失败时按括号配对恢复出最外层对象（补齐被截断的字符串和括号），
+# 再失败时逐字段定位并解析取值；最后按学者文档的字段类型校验和规整
+logger = logging.getLogger(__name__)
+
+# 字段 -> 类型：str 为字符串，[str] 为字符串列表，[dict] 为记录列表
+SCHEMA = {
+    'name': str,
+    'email': [str],
+    'workplace': str,
+    'education_track': [dict],
+    'professional_track': [dict],
+    'honor_track': [dict],
+    'keywords': [str],
+}
+NULL_STRINGS = {'', 'null', 'none', 'None', 'NULL', 'N/A', '无'}
+
+fence_pattern = re.compile(r'```(?:json)?\s*(.*?)(?:```|$)', re.S | re.I)
+trailing_comma_pattern = re.compile(r',\s*([}\]])')
+field_pattern = re.compile(r'["\'](' + '|'.join(SCHEMA) + r')["\']\s*:\s*')
+CLOSERS = {'{': '}', '[': ']'}
+
+
+def scan_value(text, start):
+    """从 start 开始扫描一个 JSON 值，返回 (值文本, 是否完整)；字符串内的括号不参与配对"""
+    stack = []
+    quote = None
+    escaped = False
+    i = start
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == quote:
+                quote = None
+                if not stack:
+                    return text[start:i + 1], True
+        elif ch in '"\'':
+            quote = ch
+        elif ch in CLOSERS:
+            stack.append(CLOSERS[ch])
+        elif ch in '}]':
+            if not stack or stack[-1] != ch:
+                # 多余的右括号：到此为止
+                return text[start:i], not stack
+            stack.pop()
+            if not stack:
+                return text[start:i + 1], True
+        elif not stack and ch in ',\n':
+            return text[start:i], True
+        i += 1
+    return text[start:], not stack and not quote
+
+
+def close_truncated(fragment):
+    """补齐被截断的字符串和括号"""
+    stack = []
+    quote = None
+    escaped = False
+    for ch in fragment:
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch in CLOSERS:
+            stack.append(CLOSERS[ch])
+        elif ch in '}]' and stack and stack[-1] == ch:
+            stack.pop()
+    if quote:
+        fragment += quote
+    return fragment.rstrip().rstrip(',:').rstrip() + ''.join(reversed(stack))
+
+
+def loads_lenient(fragment):
+    try:
+        return json.loads(fragment)
+    except json.JSONDecodeError:
+        pass
+    fragment = trailing_comma_pattern.sub(r'\1', fragment)
+    try:
+        return json.loads(fragment)
+    except json.JSONDecodeError:
+        pass
+    # 大模型偶尔输出单引号或 Python 字面量
+    pythonish = re.sub(r'\bNone\b', 'null', re.sub(r'\bTrue\b', 'true', re.sub(r'\bFalse\b', 'false', fragment)))
+    if "'" in pythonish and '"' not in pythonish:
+        pythonish = pythonish.replace("'", '"')
+    return json.loads(pythonish)
+
+
+def repair(fragment, complete=True):
+    """解析值文本；被截断时补齐括号，仍失败则从最后一个逗号处逐步截短（去掉不完整的键值）"""
+    if complete:
+        try:
+            return loads_lenient(fragment)
+        except json.JSONDecodeError:
+            pass
+    while True:
+        try:
+            return loads_lenient(close_truncated(fragment))
+        except json.JSONDecodeError:
+            cut = fragment.rfind(',')
+            if cut <= 0:
+                raise
+            fragment = fragment[:cut]
+
+
+def recover_object(text):
+    """按括号配对取出第一个完整或被截断的对象"""
+    match = fence_pattern.search(text)
+    if match and '{' in match.group(1):
+        text = match.group(1)
+    start = text.find('{')
+    if start < 0:
+        return None
+    fragment, complete = scan_value(text, start)
+    try:
+        data = repair(fragment, complete)
+    except json.JSONDecodeError:
+        return None
+    # 取到的是内层记录（例如缺少最外层的左括号）时交给逐字段解析
+    if not isinstance(data, dict) or not SCHEMA.keys() & data.keys():
+        return None
+    # 中间某个值损坏时，逐步截短会丢掉其后的所有字段，这些字段再逐字段解析补回
+    missing = SCHEMA.keys() - data.keys()
+    if missing:
+        extracted = extract_fields(fragment)
+        data.update({field: extracted[field] for field in missing if field in extracted})
+    return data
+
+
+def extract_fields(text):
+    """逐字段定位并解析取值，单个字段损坏不影响其他字段"""
+    data = {}
+    for match in field_pattern.finditer(text):
+        field = match.group(1)
+        if field in data:
+            continue
+        fragment, complete = scan_value(text, match.end())
+        try:
+            data[field] = repair(fragment.strip(), complete)
+        except json.JSONDecodeError:
+            inc('talent_summary_field_errors_total', 'Summary fields that could not be parsed', field=field)
+    return data
+
+
+def _is_null(value):
+    return value is None or (isinstance(value, str) and value.strip() in NULL_STRINGS)
+
+
+def validate(data):
+    """按 SCHEMA 规整字段，返回 (文档, 被丢弃的字段列表)；缺失或为 null 的字段取 None"""
+    doc, invalid = {}, []
+    for field, kind in SCHEMA.items():
+        value = data.get(field)
+        # 缺失或为 null 不算格式错误；列表字段的 [] 保持为 []，由 check() 判定为空档案
+        if _is_null(value) or (kind is str and isinstance(value, list) and all(_is_null(v) for v in value)):
+            doc[field] = None
+            continue
+        if kind is str:
+            if isinstance(value, list):
+                value = next((v for v in value if isinstance(v, str) and not _is_null(v)), None)
+            doc[field] = value.strip() if isinstance(value, str) else None
+        else:
+            item_type = kind[0]
+            if isinstance(value, (str, dict)):
+                value = [value]
+            if not isinstance(value, list):
+                doc[field] = None
+            else:
+                items = [v for v in value if isinstance(v, item_type) and not _is_null(v)]
+                if item_type is dict:
+                    items = [v for v in items if not all(_is_null(x) for x in v.values())]
+                else:
+                    items = [v.strip() for v in items]
+                doc[field] = items
+        if doc[field] is None:
+            invalid.append(field)
+            inc('talent_summary_field_errors_total', 'Summary fields that could not be parsed', field=field)
+    return doc, invalid
+
+
+def parse_summary(text):
+    """解析 summary_info 的输出，返回按 SCHEMA 规整后的字段；完全无法解析时所有字段为 None"""
+    data, method = None, 'failed'
+    if isinstance(text, dict):
+        data, method = text, 'strict'
+    elif isinstance(text, str):
+        try:
+            data = json.loads(text)
+            method = 'strict'
+        except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            data = recover_object(text)
+            method = 'recovered' if data is not None else 'failed'
+        if data is None:
+            data = extract_fields(text)
+            method = 'fields' if data else 'failed'
+    if method == 'failed':
+        logger.warning('unparseable summary: %.200r', text)
+    inc('talent_summary_parse_total', 'Summary parses by recovery method', method=method)
+    return validate(data or {})[0]
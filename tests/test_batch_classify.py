@@ -0,0 +1,38 @@
+from batch_classify import classify_batched, parse_verdicts, split_batches
+
+
+def test_parse_verdicts_accepts_common_formats():
+    text = '1: True\n[2] False\n3. "True"\n4、False。'
+    assert parse_verdicts(text, 4) == ['True', 'False', 'True', 'False']
+
+
+def test_parse_verdicts_marks_missing_conflicting_and_out_of_range():
+    text = '1: True\n1: False\n3: True\n9: True\nsome chatter'
+    assert parse_verdicts(text, 3) == [None, None, 'True']
+    assert parse_verdicts(None, 2) == [None, None]
+
+
+def test_split_batches_respects_budget_and_item_limit():
+    items = ['x' * 10] * 5
+    assert split_batches(items, budget=25, max_items=10) == [[0, 1], [2, 3], [4]]
+    assert split_batches(items, budget=1000, max_items=2) == [[0, 1], [2, 3], [4]]
+
+
+def test_unparsed_items_fall_back_to_single_calls():
+    singles = []
+
+    def batch(items):
+        return '1: True\n3: False'  # 第 2 条缺失
+
+    def single(item):
+        singles.append(item)
+        return 'True'
+
+    verdicts = classify_batched(['a', 'b', 'c'], batch, single, budget=1000, max_items=10)
+    assert verdicts == ['True', 'True', 'False']
+    assert singles == ['b']
+
+
+def test_failed_batch_call_retries_every_item():
+    verdicts = classify_batched(['a', 'b'], lambda items: None, lambda item: 'False', budget=1000)
+    assert verdicts == ['False', 'False']
@@ -0,0 +1,63 @@
+import time
+import cache as cache_module
+from cache import ResponseCache, cache_key, cached_post_json, has_gpt_answer
+
+
+def test_cache_key_ignores_payload_order():
+    assert cache_key('gpt', {'text': 'a', 'model': 'hy'}) == cache_key('gpt', {'model': 'hy', 'text': 'a'})
+
+
+def test_cache_key_separates_endpoints_and_payloads():
+    payload = {'text': 'a', 'model': 'hy'}
+    keys = {cache_key('gpt', payload), cache_key('chat', payload), cache_key('gpt', {**payload, 'text': 'b'}),
+            cache_key('gpt', {'text': 'a', 'model': 'gpt4o'})}
+    assert len(keys) == 4
+
+
+def make_cache(tmp_path, **kwargs):
+    return ResponseCache(path=str(tmp_path / 'cache.sqlite3'), **kwargs)
+
+
+def test_round_trip_and_ttl(tmp_path):
+    cache = make_cache(tmp_path, ttl={'search': 60, 'summary': 0})
+    cache.set('search', {'text': 'a'}, 'search', {'data': [1]})
+    cache.set('hyaide', {'query': 'a'}, 'summary', {'result': 'x'})
+    time.sleep(0.01)
+    assert cache.get('search', {'text': 'a'}, 'search') == (True, {'data': [1]})
+    assert cache.get('hyaide', {'query': 'a'}, 'summary') == (False, None)
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_readonly_and_bypass_modes(tmp_path):
+    writer = make_cache(tmp_path)
+    writer.set('gpt', {'text': 'a'}, 'workplace', {'data': {'gpt': '清华大学'}})
+    readonly = make_cache(tmp_path, mode='readonly')
+    readonly.set('gpt', {'text': 'b'}, 'workplace', {'data': {'gpt': '北京大学'}})
+    assert readonly.get('gpt', {'text': 'a'}, 'workplace')[0]
+    assert not readonly.get('gpt', {'text': 'b'}, 'workplace')[0]
+    assert make_cache(tmp_path, mode='bypass').get('gpt', {'text': 'a'}, 'workplace') == (False, None)
+
+
+def test_eviction_keeps_most_recently_accessed(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    for text in ['a', 'b', 'c']:
+        cache.set('search', {'text': text}, 'search', text)
+        time.sleep(0.01)
+    cache.get('search', {'text': 'a'}, 'search')
+    cache.evict()
+    assert [cache.get('search', {'text': t}, 'search')[0] for t in ['a', 'b', 'c']] == [True, False, True]
+
+
+def test_cached_post_json_skips_uncacheable_responses(tmp_path, monkeypatch):
+    calls = []
+
+    def post_json(endpoint, payload, raise_for_status=False):
+        calls.append(payload['text'])
+        return {'data': {'gpt': None if payload['text'] == 'bad' else 'ok'}}
+
+    monkeypatch.setattr(cache_module, 'post_json', post_json)
+    monkeypatch.setattr(cache_module, '_cache', make_cache(tmp_path))
+    for _ in range(2):
+        cached_post_json('gpt', {'text': 'good'}, 'workplace', has_gpt_answer)
+        cached_post_json('gpt', {'text': 'bad'}, 'workplace', has_gpt_answer)
+    assert calls == ['good', 'bad', 'bad']
@@ -0,0 +1,58 @@
+import pytest
+import cascade
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """按顺序返回快模型的答案，gpt4o 固定回答 'True'；记录每次调用的 endpoint"""
+    state = {'fast': [], 'calls': []}
+
+    def post_json(endpoint, payload, *args, **kwargs):
+        state['calls'].append(endpoint)
+        if endpoint == cascade.FAST['endpoint']:
+            return {'data': {'gpt': state['fast'].pop(0)}}
+        return {'data': {'gpt': 'True'}}
+
+    monkeypatch.setattr(cascade, 'post_json', post_json)
+    monkeypatch.setattr(cascade, 'CASCADE', True)
+    monkeypatch.setitem(cascade.TASK_POLICIES, 'test', {'route': 'cascade', 'threshold': 80, 'samples': 1})
+    return state
+
+
+def test_confident_fast_answer_is_accepted(model):
+    model['fast'] = ['False\nConfidence: 95']
+    assert cascade.classify('test', {'text': 'q'}) == 'False'
+    assert model['calls'] == ['chat']
+
+
+def test_low_confidence_escalates(model):
+    model['fast'] = ['False\nConfidence: 40']
+    assert cascade.classify('test', {'text': 'q'}) == 'True'
+    assert model['calls'] == ['chat', 'gpt']
+
+
+def test_unparseable_answer_escalates(model):
+    model['fast'] = ['maybe\nConfidence: 99']
+    assert cascade.classify('test', {'text': 'q'}) == 'True'
+
+
+def test_threshold_applies_to_every_sample(model):
+    cascade.TASK_POLICIES['test']['samples'] = 2
+    model['fast'] = ['False\nConfidence: 95', 'False\nConfidence: 50']
+    assert cascade.classify('test', {'text': 'q'}) == 'True'
+    assert model['calls'].count('gpt') == 1
+
+
+def test_fast_route_never_returns_raw_text(model):
+    cascade.TASK_POLICIES['test']['route'] = 'fast'
+    model['fast'] = ['maybe\nConfidence: 99']
+    assert cascade.classify('test', {'text': 'q'}) is None
+    model['fast'] = ['True\nConfidence: 10']
+    assert cascade.classify('test', {'text': 'q'}) == 'True'
+    assert 'gpt' not in model['calls']
+
+
+def test_null_data_is_tolerated(monkeypatch):
+    monkeypatch.setattr(cascade, 'post_json', lambda *args, **kwargs: {'data': None})
+    monkeypatch.setattr(cascade, 'CASCADE', True)
+    assert cascade.classify('homepage', {'text': 'q'}) is None
@@ -0,0 +1,46 @@
+import json
+import rubric
+from cluster import cluster_documents, name_keys
+
+
+def scholar(name, workplace='清华大学', **fields):
+    doc = {
+        'name': name,
+        'workplace': workplace,
+        'education_track': json.dumps([{'school': '北京大学', 'scholar': '博士'}], ensure_ascii=False),
+        'professional_track': json.dumps([{'agency': '清华大学', 'title': '教授'}], ensure_ascii=False),
+        'keywords': ['machine learning'],
+    }
+    doc.update(fields)
+    return doc
+
+
+def test_name_keys_cover_both_orders():
+    assert name_keys('张三') == {'zhang|s'}
+    assert name_keys('San Zhang') == {'san|z', 'zhang|s'}
+
+
+def test_identity_fields_merge_without_judging():
+    docs = [scholar('张三', email='zs@tsinghua.edu.cn'), scholar('李四', email='ZS@tsinghua.edu.cn')]
+    clusters, stats = cluster_documents(docs, judge=lambda a, b: False)
+    assert sorted(map(sorted, clusters)) == [[0, 1]]
+    assert stats['exact_links'] == 1 and stats['llm_calls'] == 0
+
+
+def test_only_uncertain_pairs_count_as_llm_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(rubric, 'is_same_talent', lambda a, b: calls.append(1) or 'False')
+    # 前两份履历一致由评分规则本地合并；第三份只有姓名和机构，落在不确定区间
+    docs = [scholar('张三'), scholar('Zhang San'), {'name': 'San Zhang', 'workplace': '清华大学'}]
+    clusters, stats = cluster_documents(docs, max_workers=1)
+    assert sorted(map(sorted, clusters)) == [[0, 1], [2]]
+    assert stats['llm_calls'] == len(calls) == 2
+    assert stats['judged_pairs'] == 3
+    assert stats['llm_calls_saved'] == 3 - 2
+
+
+def test_transitively_merged_pairs_are_skipped():
+    docs = [scholar('张三') for _ in range(6)]
+    clusters, stats = cluster_documents(docs, judge=lambda a, b: True, max_workers=1)
+    assert len(clusters) == 1
+    assert stats['judged_pairs'] == stats['llm_calls'] == 5
@@ -0,0 +1,34 @@
+from compaction import compact_body, compact_item, query_terms, utf8_len
+
+
+def test_short_bodies_only_normalize_whitespace():
+    assert compact_body('张三  教授\n\n\n清华大学', budget=1000) == '张三 教授\n清华大学'
+
+
+def test_long_bodies_keep_relevant_sentences_within_budget():
+    filler = '今天天气很好，大家出去散步。' * 200
+    body = f'首页 | 登录\n{filler}张三是清华大学教授。研究方向为机器学习。{filler}版权所有 © 2024'
+    compacted = compact_body(body, ['张三'], budget=600)
+    assert utf8_len(compacted) <= 600
+    assert '张三是清华大学教授' in compacted and '研究方向为机器学习' in compacted
+    assert '版权所有' not in compacted and '登录' not in compacted
+
+
+def test_truncation_keeps_valid_utf8():
+    compacted = compact_body('教授。' * 1000, budget=100)
+    assert utf8_len(compacted) <= 100
+    compacted.encode('utf-8')
+
+
+def test_compact_item_leaves_other_fields():
+    item = {'url': 'http://a.edu', 'title': 'T', 'body': '教授。' * 2000}
+    compacted = compact_item(item, budget=300)
+    assert compacted['url'] == item['url'] and compacted['title'] == 'T'
+    assert utf8_len(compacted['body']) <= 300
+    assert compact_item('not a dict') == 'not a dict'
+
+
+def test_query_terms():
+    assert query_terms({'name': 'San Zhang', 'workplace': 'Tsinghua Univ'}) == \
+        ['San Zhang', 'San', 'Zhang', 'Tsinghua Univ', 'Tsinghua', 'Univ']
+    assert query_terms(None) == []
@@ -0,0 +1,51 @@
+import time
+import compare_test
+from compare_test import enrich_both
+
+
+def fake_enrichment(monkeypatch, outcomes):
+    """outcomes: 姓名 -> (耗时, 是否成功)；返回记录结束顺序的列表"""
+    finished = []
+
+    def get_talent_doc(doc):
+        delay, ok = outcomes[doc['name']]
+        time.sleep(delay)
+        finished.append(doc['name'])
+        return ({**doc, 'enriched': True} if ok else None), []
+
+    monkeypatch.setattr(compare_test, 'get_talent_doc', get_talent_doc)
+    return finished
+
+
+def test_both_succeed(monkeypatch):
+    fake_enrichment(monkeypatch, {'a': (0.01, True), 'b': (0.02, True)})
+    failed, doc1, doc2 = enrich_both({'name': 'a'}, {'name': 'b'})
+    assert failed is None and doc1['name'] == 'a' and doc2['name'] == 'b'
+
+
+def test_doc1_failure_returns_without_waiting_for_doc2(monkeypatch):
+    fake_enrichment(monkeypatch, {'a': (0.01, False), 'b': (0.5, True)})
+    started = time.monotonic()
+    assert enrich_both({'name': 'a'}, {'name': 'b'}) == (1, None, None)
+    assert time.monotonic() - started < 0.3
+
+
+def test_both_failing_reports_doc1_regardless_of_order(monkeypatch):
+    fake_enrichment(monkeypatch, {'a': (0.1, False), 'b': (0.01, False)})
+    assert enrich_both({'name': 'a'}, {'name': 'b'})[0] == 1
+    fake_enrichment(monkeypatch, {'a': (0.01, False), 'b': (0.1, False)})
+    assert enrich_both({'name': 'a'}, {'name': 'b'})[0] == 1
+
+
+def test_doc2_failure_after_doc1_succeeds(monkeypatch):
+    fake_enrichment(monkeypatch, {'a': (0.05, True), 'b': (0.01, False)})
+    assert enrich_both({'name': 'a'}, {'name': 'b'}) == (2, None, None)
+
+
+def test_main_compare_error_codes(monkeypatch):
+    fake_enrichment(monkeypatch, {'甲': (0.01, False), '乙': (0.01, False)})
+    result = compare_test.main_compare('{"name": "甲"}', '{"name": "乙"}')
+    assert result['code'] == 90004
+    fake_enrichment(monkeypatch, {'甲': (0.01, True), '乙': (0.01, False)})
+    assert compare_test.main_compare('{"name": "甲"}', '{"name": "乙"}')['code'] == 90003
+    assert compare_test.main_compare('not json', '{}')['code'] == 90001
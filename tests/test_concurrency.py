@@ -0,0 +1,47 @@
+import time
+import threading
+from concurrency import ordered_map, first_in_order
+
+
+def test_ordered_map_keeps_input_order():
+    # 先提交的条目最慢，结果仍按输入顺序返回
+    delays = [0.05, 0.03, 0.01, 0.0]
+    assert ordered_map(lambda d: (time.sleep(d), d)[1], delays, 4) == delays
+
+
+def test_ordered_map_bounds_concurrency():
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def work(item):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.01)
+        with lock:
+            state['running'] -= 1
+        return item * 2
+
+    assert ordered_map(work, range(12), 3) == [i * 2 for i in range(12)]
+    assert state['peak'] <= 3
+
+
+def test_ordered_map_empty_and_serial():
+    assert ordered_map(str, [], 4) == []
+    assert ordered_map(str, [1, 2], 1) == ['1', '2']
+
+
+def test_first_in_order_prefers_earlier_items_and_stops_early():
+    seen = []
+
+    def work(item):
+        seen.append(item)
+        time.sleep(0.02 if item == 1 else 0)
+        return item
+
+    assert first_in_order(work, range(10), lambda r: r in (1, 2), max_workers=3) == 1
+    assert max(seen) < 3
+
+
+def test_first_in_order_without_match():
+    assert first_in_order(lambda item: item, range(5), lambda r: False, max_workers=2) is None
@@ -0,0 +1,47 @@
+import random
+import dedupe
+from dedupe import canonical_url, collapse_near_duplicates, estimated_jaccard, keep_distinct, minhash
+
+
+def page(seed, length=2000):
+    rng = random.Random(seed)
+    return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz研究大学教授论文 ') for _ in range(length))
+
+
+def test_canonical_url_drops_mirrors_and_tracking():
+    assert canonical_url('https://m.example.edu.cn/people/zs/index.html?utm_source=x&id=3') == \
+        canonical_url('http://www.example.edu.cn/people/zs/?id=3')
+    assert canonical_url('http://example.edu.cn/a?id=3') != canonical_url('http://example.edu.cn/a?id=4')
+
+
+def test_minhash_estimates_similarity():
+    body = page(1)
+    assert estimated_jaccard(minhash(body), minhash(body)) == 1.0
+    assert estimated_jaccard(minhash(body), minhash(body[:1950] + 'x' * 5)) >= 0.85
+    assert estimated_jaccard(minhash(body), minhash(page(2))) < 0.2
+
+
+def test_collapse_keeps_order_and_best_of_each_group():
+    body = page(1)
+    items = [
+        {'url': 'http://a.edu/zs', 'title': 'Zhang San', 'body': body},
+        {'url': 'http://b.com/other', 'title': 'Other', 'body': page(2)},
+        {'url': 'http://mirror.cn/zs', 'title': '张三 清华大学', 'body': body + ' '},
+        {'url': 'http://www.a.edu/zs/index.html', 'title': 'Zhang San', 'body': 'short'},
+    ]
+    result = collapse_near_duplicates(items)
+    assert [item['title'] for item in result] == ['张三 清华大学', 'Other']
+
+
+def test_url_match_skips_signature(monkeypatch):
+    calls = []
+    original = dedupe.minhash
+    monkeypatch.setattr(dedupe, 'minhash', lambda text: calls.append(text) or original(text))
+    items = [{'url': 'http://a.edu/zs', 'body': page(1)}, {'url': 'http://m.a.edu/zs/', 'body': page(2)}]
+    assert len(collapse_near_duplicates(items)) == 1
+    assert len(calls) == 1
+
+
+def test_keep_distinct_compares_with_every_kept_item():
+    items = ['a1', 'b1', 'a2', 'c1', 'b2']
+    assert keep_distinct(items, lambda x, y: x[0] == y[0], max_workers=2) == ['a1', 'b1', 'c1']
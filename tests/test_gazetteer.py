@@ -0,0 +1,61 @@
+import threading
+import pytest
+from gazetteer import Gazetteer, is_mainland_school
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    return Gazetteer(path=str(tmp_path / 'gazetteer.json'))
+
+
+@pytest.mark.parametrize('workplace, canonical', [
+    ('Chinese Acad Sci, Inst Chem, Beijing 100190, Peoples R China', '中国科学院化学研究所'),
+    ('Chinese Acad Sci, Beijing', '中国科学院'),
+    ('Peking Univ, First Hosp, Beijing', '北京大学第一医院'),
+    ('Nanjing Univ Sci & Technol, Sch Comp Sci', '南京理工大学'),
+    ('Tsinghua Univ Dept Phys', '清华大学'),
+    ('Cent S Univ, Changsha', '中南大学'),
+    ('China Med Univ, Taichung, Taiwan', None),
+    ('Tsinghua Univrsity', '清华大学'),
+])
+def test_resolve(gazetteer, workplace, canonical):
+    assert gazetteer.resolve(workplace) == canonical
+
+
+def test_school_rule():
+    assert is_mainland_school('北京协和医学院')
+    assert is_mainland_school('中国科学院化学研究所')
+    assert not is_mainland_school('中国医学科学院')
+    assert not is_mainland_school('香港大学')
+
+
+def test_learned_entries_survive_concurrent_writers(gazetteer, tmp_path):
+    other = Gazetteer(path=gazetteer.path)
+    gazetteer.learn_workplace('Some Lab A', '某实验室甲')
+    other.learn_school('某学院乙', True)
+    reloaded = Gazetteer(path=gazetteer.path)
+    assert reloaded.resolve('Some Lab A') == '某实验室甲'
+    assert reloaded.school_flag('某学院乙') is True
+
+
+def test_resolve_while_learning(gazetteer):
+    errors = []
+    stop = threading.Event()
+
+    def resolve():
+        while not stop.is_set():
+            try:
+                gazetteer.resolve('Tsinghua Univrsity Beijing')
+            except Exception as e:
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=resolve) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(200):
+        gazetteer._add_alias(f'Tsinghua Lab {i}', f'实验室{i}')
+    stop.set()
+    for reader in readers:
+        reader.join()
+    assert errors == []
@@ -0,0 +1,28 @@
+from name_index import NameIndex
+
+
+def test_homophones_are_not_resolved(tmp_path):
+    index = NameIndex(str(tmp_path / 'name_index.json'))
+    index.add('王伟', ['Wang Wei'], '清华大学')
+    assert index.lookup('Wang Wei', 'Tsinghua Univ') == '王伟'
+    index.add('汪威', ['Wang Wei'], '清华大学')
+    assert index.lookup('Wang Wei', 'Tsinghua Univ') is None
+    assert index.stats()['ambiguous'] == 1
+
+
+def test_homophones_at_different_places_stay_separate(tmp_path):
+    index = NameIndex(str(tmp_path / 'name_index.json'))
+    index.add('王伟', ['Wang Wei'], '清华大学')
+    index.add('汪威', ['Wang Wei'], '北京大学')
+    assert index.lookup('Wang Wei', '清华大学') == '王伟'
+    assert index.lookup('Wang Wei', '北京大学') == '汪威'
+
+
+def test_concurrent_writers_merge_on_save(tmp_path):
+    path = str(tmp_path / 'name_index.json')
+    first, second = NameIndex(path), NameIndex(path)
+    first.add('张三', ['Zhang San'], '清华大学')
+    second.add('李四', ['Li Si'], '北京大学')
+    reloaded = NameIndex(path)
+    assert reloaded.lookup('Zhang San', '清华大学') == '张三'
+    assert reloaded.lookup('Li Si', '北京大学') == '李四'
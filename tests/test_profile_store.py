@@ -0,0 +1,45 @@
+from profile_store import profile_key
+
+
+def test_profile_key_normalizes_name_workplace_and_email():
+    a = {'name': 'Zhang San', 'workplace': 'Tsinghua Univ', 'email': ['A@x.edu', 'b@y.com']}
+    b = {'name': 'zhang  san', 'workplace': '清华大学', 'email': ['b@y.com', 'a@x.edu']}
+    assert profile_key(a, 'doc') == profile_key(b, 'doc')
+
+
+def test_profile_key_separates_identity_fields():
+    base = {'name': 'Zhang San', 'workplace': 'Tsinghua Univ', 'aminer_id': '1'}
+    assert profile_key(base, 'doc') != profile_key({**base, 'aminer_id': '2'}, 'doc')
+    assert profile_key(base, 'doc') != profile_key({**base, 'mainpage': 'http://a.edu/~zs'}, 'doc')
+    assert profile_key(base, 'doc') != profile_key(base, 'paper')
+    assert profile_key(base, 'doc') == profile_key({**base, 'mainpage': None}, 'doc')
+
+
+def test_profile_key_matches_across_endpoints():
+    import json
+    from compare_test import process_doc
+    raw = {'name': '张三', 'workplace': '清华大学', 'email': 'zs@tsinghua.edu.cn', 'keywords': [],
+           'honor_track': json.dumps([{'award': '国家杰出青年科学基金获得者', 'time': '2020'}], ensure_ascii=False),
+           'education_track': '[]', 'professional_track': 'null'}
+    processed = process_doc(dict(raw))
+    assert processed['honor_track'] == [{'award': '国家杰出青年科学基金获得者', 'time': '2020'}]
+    assert profile_key(raw, 'doc') == profile_key(processed, 'doc')
+
+
+def test_fetch_serves_repeat_lookups_and_keeps_callers_apart(tmp_path):
+    from profile_store import ProfileStore
+    store = ProfileStore(path=str(tmp_path / 'profiles.sqlite3'))
+    runs = []
+
+    def pipeline(doc):
+        runs.append(doc.get('aminer_id'))
+        return {**doc, 'keywords': ['ml']}, []
+
+    doc = {'name': 'Zhang San', 'workplace': 'Tsinghua Univ', 'aminer_id': '1'}
+    first, _ = store.fetch(dict(doc), 'doc', pipeline)
+    again, _ = store.fetch(dict(doc), 'doc', pipeline)
+    other, _ = store.fetch({**doc, 'aminer_id': '2'}, 'doc', pipeline)
+    assert first == again and runs == ['1', '2']
+    assert other['aminer_id'] == '2'
+    again['keywords'].append('changed')
+    assert store.fetch(dict(doc), 'doc', pipeline)[0]['keywords'] == ['ml']
@@ -0,0 +1,42 @@
+from ranking import budget_top_k, keyword_coverage, rank_hits
+from get_talent_doc import preprocess_google_data, preprocess_sougou_data
+
+
+def hit(url, body, title=''):
+    return {'url': url, 'title': title, 'body': body}
+
+
+def test_keyword_coverage_counts_categories():
+    assert keyword_coverage('教育背景：北京大学博士；研究方向：机器学习；发表论文 30 篇') == {'education', 'field', 'paper'}
+
+
+def test_rank_orders_by_domain_categories_and_name():
+    items = [
+        hit('http://news.com/a', '张三 教授 研究方向 机器学习'),
+        hit('http://cs.tsinghua.edu.cn/zs', '张三 教授 研究方向 机器学习'),
+        hit('http://blog.com/b', '李四 教授 研究方向 机器学习'),
+    ]
+    ranked = rank_hits(items, ['张三'], require_keywords=True, budget=100)
+    assert [item['url'] for item in ranked] == ['http://cs.tsinghua.edu.cn/zs', 'http://news.com/a', 'http://blog.com/b']
+
+
+def test_require_keywords_drops_uncategorized_hits():
+    items = [hit('http://a.com', '天气预报'), hit('http://b.com', '张三 教授')]
+    assert [item['url'] for item in rank_hits(items, require_keywords=True, budget=100)] == ['http://b.com']
+    assert len(rank_hits(items, require_keywords=False, budget=100)) == 2
+
+
+def test_budget_limits_hits_unless_truncation_is_disabled():
+    items = [hit(f'http://a.com/{i}', f'教授 {i}') for i in range(30)]
+    assert budget_top_k(10) == 5 and budget_top_k(1) == 1
+    assert len(rank_hits(items, budget=10)) == 5
+    assert len(rank_hits(items, budget=10, truncate=False)) == 30
+
+
+def test_preprocess_filters_before_ranking():
+    sougou = [hit('http://zhaopin.com/x', '教授 招聘'), {'url': 'http://a.edu', 'title': 'no body'},
+              hit('http://a.edu/zs', '张三 教授')]
+    assert [item['url'] for item in preprocess_sougou_data(sougou, {'name': '张三'})] == ['http://a.edu/zs']
+    google = [{'link': f'http://a.com/{i}', 'title': 't', 'body': '张三'} for i in range(30)]
+    assert len(preprocess_google_data(google, {'name': '张三'}, budget=10)) == 5
+    assert len(preprocess_google_data(google, {'name': '张三'}, budget=10, truncate=False)) == 30
@@ -0,0 +1,52 @@
+import json
+import rubric
+from reference_index import ReferenceIndex, load_reference
+
+
+def scholar(name, workplace='清华大学', **fields):
+    doc = {
+        'name': name,
+        'workplace': workplace,
+        'education_track': json.dumps([{'school': '北京大学', 'scholar': '博士'}], ensure_ascii=False),
+        'professional_track': json.dumps([{'agency': '清华大学', 'title': '教授'}], ensure_ascii=False),
+        'keywords': ['machine learning'],
+    }
+    doc.update(fields)
+    return doc
+
+
+def test_identity_hits_skip_judging():
+    index = ReferenceIndex([scholar('李四', aminer_id='42'), scholar('王五', workplace='北京大学')])
+    matches, stats = index.match({'name': '张三', 'aminer_id': '42'}, judge=lambda a, b: True)
+    assert matches == [{'index': 0, 'via': 'identity'}]
+    assert stats['candidates'] == 0 and stats['llm_calls'] == 0
+
+
+def test_candidates_are_blocked_by_name_and_place():
+    index = ReferenceIndex([scholar('张三'), scholar('张三', workplace='北京大学'),
+                            {'name': 'San Zhang'}, scholar('李四')])
+    assert index.candidates({'name': 'Zhang San', 'workplace': 'Tsinghua Univ'}) == {0, 2}
+    assert index.candidates({'name': 'Zhang San'}) == {0, 1, 2}
+
+
+def test_llm_calls_count_only_uncertain_candidates(monkeypatch):
+    calls = []
+    monkeypatch.setattr(rubric, 'is_same_talent', lambda a, b: calls.append(1) or 'False')
+    index = ReferenceIndex([scholar('Zhang San'), {'name': 'San Zhang', 'workplace': '清华大学'}])
+    matches, stats = index.match(scholar('张三'))
+    assert matches == [{'index': 0, 'via': 'judge'}]
+    assert stats['candidates'] == 2 and stats['llm_calls'] == len(calls) == 1
+
+
+def test_enrich_failure_keeps_identity_hits_only():
+    index = ReferenceIndex([scholar('张三', email='zs@x.edu'), scholar('张三')])
+    matches, stats = index.match(scholar('张三', email='ZS@x.edu'), judge=lambda a, b: True, enrich=lambda d: None)
+    assert matches == [{'index': 0, 'via': 'identity'}] and stats['llm_calls'] == 0
+
+
+def test_load_reference_reads_batch_runner_output(tmp_path):
+    path = tmp_path / 'corpus.jsonl'
+    path.write_text('\n'.join([json.dumps({'name': '张三'}), '',
+                               json.dumps({'row': 1, 'status': 'ok', 'doc': {'name': '李四'}}),
+                               json.dumps({'row': 2, 'status': 'failed', 'doc': None})]), encoding='utf-8')
+    assert load_reference(str(path)) == [{'name': '张三'}, {'name': '李四'}]
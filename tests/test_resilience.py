@@ -0,0 +1,102 @@
+import json
+import itertools
+import httpx
+import pytest
+import resilience
+from resilience import (CircuitOpenError, call_with_resilience, configure_resilience, degrade_on_failure,
+                        is_endpoint_failure, is_retryable)
+
+_names = itertools.count()
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    monkeypatch.setattr(resilience, 'backoff_delay', lambda endpoint, attempt: 0)
+    name = f'test-{next(_names)}'
+    configure_resilience(name, retries=2, hedge=False, breaker_failures=3, breaker_reset=60.0)
+    return name
+
+
+def status_error(code):
+    request = httpx.Request('POST', 'http://example.invalid')
+    return httpx.HTTPStatusError('error', request=request, response=httpx.Response(code, request=request))
+
+
+def flaky(*outcomes):
+    calls = []
+    outcomes = list(outcomes)
+
+    def send():
+        calls.append(1)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return send, calls
+
+
+def test_retryable_errors():
+    assert is_retryable(status_error(503)) and is_retryable(status_error(429))
+    assert is_retryable(httpx.ConnectError('reset')) and is_retryable(json.JSONDecodeError('x', '', 0))
+    assert not is_retryable(status_error(400)) and not is_retryable(ValueError())
+    assert is_endpoint_failure(CircuitOpenError())
+
+
+def test_retries_until_success(endpoint):
+    send, calls = flaky(httpx.ConnectError('reset'), status_error(502), {'ok': True})
+    assert call_with_resilience(endpoint, send) == {'ok': True}
+    assert len(calls) == 3
+
+
+def test_gives_up_after_retries(endpoint):
+    send, calls = flaky(*[httpx.ConnectError('reset')] * 3)
+    with pytest.raises(httpx.ConnectError):
+        call_with_resilience(endpoint, send)
+    assert len(calls) == 3
+
+
+def test_client_errors_are_not_retried_or_counted(endpoint):
+    send, calls = flaky(status_error(404))
+    with pytest.raises(httpx.HTTPStatusError):
+        call_with_resilience(endpoint, send)
+    assert len(calls) == 1
+    _, breaker = resilience._state(endpoint)
+    breaker.failures = 2
+    send, _ = flaky(status_error(400))
+    with pytest.raises(httpx.HTTPStatusError):
+        call_with_resilience(endpoint, send)
+    assert breaker.failures == 2  # 4xx 既不清零也不累加
+
+
+def test_breaker_opens_and_recovers(endpoint):
+    send, calls = flaky(*[httpx.ConnectError('reset')] * 3)
+    with pytest.raises(httpx.ConnectError):
+        call_with_resilience(endpoint, send)
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience(endpoint, lambda: 'unused')
+    # 过了 breaker_reset 之后放行一个试探请求，成功则关闭熔断
+    _, breaker = resilience._state(endpoint)
+    breaker.opened_at -= 61
+    assert call_with_resilience(endpoint, lambda: 'ok') == 'ok'
+    assert breaker.opened_at is None and breaker.failures == 0
+
+
+def test_half_open_trial_released_by_client_error(endpoint):
+    _, breaker = resilience._state(endpoint)
+    breaker.failures, breaker.opened_at = 3, resilience.time.monotonic() - 61
+    send, _ = flaky(status_error(400))
+    with pytest.raises(httpx.HTTPStatusError):
+        call_with_resilience(endpoint, send)
+    assert breaker.allow()  # 试探名额已归还
+
+
+def test_degrade_on_failure():
+    @degrade_on_failure('search', dict)
+    def search(error):
+        raise error
+
+    assert search(CircuitOpenError()) == {}
+    assert search(httpx.ReadTimeout('slow')) == {}
+    with pytest.raises(ValueError):
+        search(ValueError())
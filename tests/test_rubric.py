@@ -0,0 +1,53 @@
+import json
+import rubric
+from rubric import local_verdict, same_name, same_place, score_pair
+
+
+def scholar(name, **fields):
+    doc = {
+        'name': name,
+        'workplace': '清华大学',
+        'education_track': json.dumps([{'school': '北京大学', 'scholar': '博士'}], ensure_ascii=False),
+        'professional_track': json.dumps([{'agency': '清华大学', 'title': '教授'}], ensure_ascii=False),
+        'keywords': ['machine learning', 'computer vision'],
+    }
+    doc.update(fields)
+    return doc
+
+
+def test_same_name_across_scripts_and_order():
+    assert same_name('张三', 'Zhang San')
+    assert same_name('San Zhang', 'zhang-san')
+    assert not same_name('张三', '章三')
+    assert not same_name('Zhang San', 'Li Si')
+
+
+def test_same_place_compares_canonical_names():
+    assert same_place('Tsinghua Univ', '清华大学')
+    assert not same_place('北京大学', '北京大学医学部')
+
+
+def test_high_score_accepts_only_when_names_agree():
+    breakdown = score_pair(scholar('张三'), scholar('Zhang San'))
+    assert breakdown['score'] >= rubric.ACCEPT_SCORE
+    assert local_verdict(breakdown) is True
+
+    breakdown = score_pair(scholar('张三'), scholar('李四'))
+    assert breakdown['score'] >= rubric.ACCEPT_SCORE
+    assert local_verdict(breakdown) is None
+
+
+def test_low_comparable_score_rejects():
+    other = scholar('Zhang San', workplace='复旦大学',
+                    education_track=json.dumps([{'school': '南京大学', 'scholar': '硕士'}], ensure_ascii=False),
+                    professional_track=json.dumps([{'agency': '复旦大学', 'title': '讲师'}], ensure_ascii=False),
+                    keywords=['organic chemistry'])
+    assert local_verdict(score_pair(scholar('张三'), other)) is False
+
+
+def test_uncertain_pair_goes_to_llm(monkeypatch):
+    monkeypatch.setattr(rubric, 'is_same_talent', lambda doc1, doc2: 'True')
+    before = dict(rubric.stats)
+    assert rubric.judge_same_talent(scholar('张三'), scholar('李四')) == 'True'
+    assert rubric.stats['llm'] == before['llm'] + 1
+    assert rubric.recent_scores(1)[0]['decided_by'] == 'llm'
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import pytest
+from singleflight import SingleFlight
+
+
+def test_threads_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(1)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('k', work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flight.leaders + flight.coalesced < 5:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == [42] * 5 and len(calls) == 1
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado('k', work))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.ado('k', work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == 42
+        assert leader.cancelled()
+        assert flight._tasks == {}
+
+    asyncio.run(main())
+    assert len(calls) == 1
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError('boom')
+
+    async def main():
+        results = await asyncio.gather(flight.ado('k', work), flight.ado('k', work), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+
+    asyncio.run(main())
+    with pytest.raises(ValueError):
+        flight.do('k', lambda: (_ for _ in ()).throw(ValueError('boom')))
+
+
+def test_async_transport_coalesces_identical_requests(monkeypatch):
+    import transport
+    calls = []
+
+    async def apost_json(endpoint, payload, raise_for_status=False):
+        calls.append(payload['text'])
+        await asyncio.sleep(0.02)
+        return {'data': {'gpt': payload['text']}}
+
+    monkeypatch.setattr(transport, 'apost_json', apost_json)
+
+    async def main():
+        requests = [transport.acoalesced_post_json('gpt', {'text': text}) for text in ['a'] * 4 + ['b']]
+        return await asyncio.gather(*requests)
+
+    results = asyncio.run(main())
+    assert [r['data']['gpt'] for r in results] == ['a'] * 4 + ['b']
+    assert sorted(calls) == ['a', 'b']
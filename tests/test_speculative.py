@@ -0,0 +1,55 @@
+import time
+import threading
+import pytest
+from speculative import first_success
+
+
+def branches_for(spec):
+    started = []
+    lock = threading.Lock()
+
+    def make(index, delay, value):
+        def branch():
+            with lock:
+                started.append(index)
+            time.sleep(delay)
+            if isinstance(value, Exception):
+                raise value
+            return value
+        return branch
+
+    return [make(i, delay, value) for i, (delay, value) in enumerate(spec)], started
+
+
+def accept(result):
+    return result is not None
+
+
+def test_lower_priority_success_stops_later_branches():
+    # 分支 1 先成功时分支 0 仍在跑，分支 2 不应再启动
+    branches, started = branches_for([(0.3, None), (0.02, 'b'), (0.01, 'c')])
+    assert first_success(branches, accept, max_branches=2) == (1, [None, 'b', None])
+    assert sorted(started) == [0, 1]
+
+
+def test_priority_wins_over_completion_order():
+    branches, started = branches_for([(0.1, 'a'), (0.01, 'b'), (0.01, 'c')])
+    winner, results = first_success(branches, accept, max_branches=2)
+    assert (winner, results[0]) == (0, 'a')
+    assert 2 not in started
+
+
+def test_hedge_delay_defers_later_branches():
+    branches, started = branches_for([(0.02, 'a'), (0.02, 'b')])
+    assert first_success(branches, accept, max_branches=2, hedge_delay=1.0)[0] == 0
+    assert started == [0]
+
+
+def test_all_failures_match_serial_semantics():
+    branches, started = branches_for([(0.01, None), (0.01, None), (0.01, None)])
+    assert first_success(branches, accept, max_branches=2) == (2, [None, None, None])
+    assert sorted(started) == [0, 1, 2]
+
+    branches, _ = branches_for([(0.01, ValueError('first')), (0.01, ValueError('second'))])
+    with pytest.raises(ValueError, match='first'):
+        first_success(branches, accept, max_branches=2)
@@ -0,0 +1,47 @@
+from summary_parser import parse_summary, validate
+
+
+def test_strict_json():
+    doc = parse_summary('{"name": "张三", "keywords": ["ml"], "email": "a@x.edu"}')
+    assert doc['name'] == '张三' and doc['keywords'] == ['ml'] and doc['email'] == ['a@x.edu']
+
+
+def test_malformed_value_keeps_later_fields():
+    text = ('{"name":"张三","education_track":[{"school":"北大","scholar":博士}],'
+            '"keywords":["ml"],"workplace":"中山大学","email":null}')
+    doc = parse_summary(text)
+    assert doc['name'] == '张三'
+    assert doc['education_track'] == [{'school': '北大'}]
+    assert doc['keywords'] == ['ml']
+    assert doc['workplace'] == '中山大学'
+
+
+def test_truncated_output_is_closed():
+    doc = parse_summary('```json\n{"name": "李四", "workplace": "清华大学", "keywords": ["a", "b"')
+    assert doc['name'] == '李四' and doc['workplace'] == '清华大学' and doc['keywords'] == ['a', 'b']
+
+
+def test_python_literals():
+    doc = parse_summary("{'name': '王五', 'honor_track': None, 'keywords': ['x']}")
+    assert doc['name'] == '王五' and doc['honor_track'] is None and doc['keywords'] == ['x']
+
+
+def test_nulls_are_not_schema_errors():
+    doc, invalid = validate({'name': ['null'], 'email': [None], 'workplace': None, 'keywords': 5})
+    assert doc['name'] is None and doc['email'] == []
+    assert invalid == ['keywords']
+
+
+def test_empty_lists_stay_empty():
+    doc, invalid = validate({'education_track': [], 'professional_track': [], 'keywords': []})
+    assert doc['education_track'] == [] and doc['professional_track'] == [] and doc['keywords'] == []
+    assert invalid == []
+
+
+def test_empty_summary_is_rejected_by_check():
+    from get_talent_doc import check, update_doc2_from_summary
+    empty = '{"education_track": [], "professional_track": [], "keywords": []}'
+    assert check(update_doc2_from_summary({'name': '张三'}, empty)) is None
+    assert check(update_doc2_from_summary({'name': '张三'}, '{"name": "张三", "workplace": "清华大学"}')) is None
+    doc = check(update_doc2_from_summary({'name': '张三'}, '{"keywords": ["ml"], "education_track": []}'))
+    assert doc['keywords'] == ['ml'] and doc['education_track'] == '[]'
@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import threading
+import asyncio
+import httpx
+from metrics import record_request
+from resilience import call_with_resilience, acall_with_resilience
+import singleflight
+
+# 所有外部服务共用的连接配置，可通过环境变量或 configure() 指向本地替身服务
+search_url = os.environ.get('TALENT_SEARCH_URL', "http://101.226.141.241/search")
+gpt_url = os.environ.get('TALENT_GPT_URL', "http://101.226.141.241/gpt3")
+chat_url = os.environ.get('TALENT_CHAT_URL', "http://101.226.141.241/chat")
+url = os.environ.get(
+    'TALENT_HYAIDE_URL',
+    'http://stream-server-online-hyaide-app.turbotke.production.polaris:81/openapi/app_platform/app_create')
+headers = {
+    "Content-Type": "application/json"
+}
+hy_headers = {
+    'Authorization': 'Bearer 7auGXNATFSKl7dF',
+    'Content-Type': 'application/json'
+}
+
+ENDPOINTS = {
+    'search': {'url': search_url, 'headers': headers, 'timeout': 30.0},
+    'gpt': {'url': gpt_url, 'headers': headers, 'timeout': 120.0},
+    'chat': {'url': chat_url, 'headers': headers, 'timeout': 120.0},
+    'hyaide': {'url': url, 'headers': hy_headers, 'timeout': 120.0},
+}
+
+# 替身服务下各 endpoint 的路径
+ENDPOINT_PATHS = {
+    'search': '/search',
+    'gpt': '/gpt3',
+    'chat': '/chat',
+    'hyaide': '/openapi/app_platform/app_create',
+}
+
+POOL_LIMITS = {
+    'max_connections': int(os.environ.get('TALENT_MAX_CONNECTIONS', 100)),
+    'max_keepalive_connections': int(os.environ.get('TALENT_MAX_KEEPALIVE', 20)),
+    'keepalive_expiry': 30.0,
+}
+CONNECT_TIMEOUT = 5.0
+# 设置后把每次成功的请求和响应追加写入该文件，供替身服务回放
+RECORD_PATH = os.environ.get('TALENT_RECORD_PATH')
+
+_lock = threading.Lock()
+_sync_client = None
+_sync_pid = None
+_async_clients = {}
+_ssl_context = None
+
+
+def configure(base_url=None, endpoints=None, timeouts=None):
+    """修改 endpoint 地址或超时，base_url 会把所有 endpoint 指向同一替身服务"""
+    if base_url:
+        base_url = base_url.rstrip('/')
+        for name, path in ENDPOINT_PATHS.items():
+            ENDPOINTS[name]['url'] = base_url + path
+    for name, endpoint_url in (endpoints or {}).items():
+        ENDPOINTS[name]['url'] = endpoint_url
+    for name, timeout in (timeouts or {}).items():
+        ENDPOINTS[name]['timeout'] = timeout
+    close()
+
+
+def _limits():
+    return httpx.Limits(**POOL_LIMITS)
+
+
+def ssl_context():
+    # 加载 CA 证书较慢，创建一次后所有客户端（包括 fork 出的 worker）共用
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = httpx.create_ssl_context()
+    return _ssl_context
+
+
+def _timeout(endpoint):
+    return httpx.Timeout(ENDPOINTS[endpoint]['timeout'], connect=CONNECT_TIMEOUT)
+
+
+def get_client():
+    # fork 出的子进程不能复用父进程的连接
+    global _sync_client, _sync_pid
+    pid = os.getpid()
+    if _sync_client is None or _sync_pid != pid:
+        with _lock:
+            if _sync_client is None or _sync_pid != pid:
+                _sync_client = httpx.Client(limits=_limits(), verify=ssl_context())
+                _sync_pid = pid
+    return _sync_client
+
+
+def get_async_client():
+    # httpx.AsyncClient 绑定在创建它的事件循环上
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        # 顺带丢掉已关闭事件循环的客户端（例如每次 asyncio.run 都会新建循环）
+        for stale in [l for l in _async_clients if l.is_closed()]:
+            _async_clients.pop(stale, None)
+        client = httpx.AsyncClient(limits=_limits(), verify=ssl_context())
+        _async_clients[loop] = client
+    return client
+
+
+def _request_args(endpoint, payload):
+    config = ENDPOINTS[endpoint]
+    return {
+        'url': config['url'],
+        'headers': config['headers'],
+        'content': json.dumps(payload),
+        'timeout': _timeout(endpoint),
+    }
+
+
+def _record(endpoint, payload, data):
+    if not RECORD_PATH:
+        return
+    line = json.dumps({'endpoint': endpoint, 'payload': payload, 'response': data}, ensure_ascii=False)
+    with _lock:
+        with open(RECORD_PATH, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+def _model(payload):
+    return payload.get('model') or payload.get('forward_service') or 'none'
+
+
+def _post_once(endpoint, payload, raise_for_status=False):
+    args = _request_args(endpoint, payload)
+    started = time.perf_counter()
+    response, error = None, None
+    try:
+        response = get_client().post(**args)
+        if raise_for_status:
+            response.raise_for_status()
+        data = response.json()
+        _record(endpoint, payload, data)
+        return data
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        record_request(endpoint, _model(payload), time.perf_counter() - started, len(args['content']),
+                       len(response.content) if response is not None else None, error)
+
+
+async def _apost_once(endpoint, payload, raise_for_status=False):
+    args = _request_args(endpoint, payload)
+    started = time.perf_counter()
+    response, error = None, None
+    try:
+        response = await get_async_client().post(**args)
+        if raise_for_status:
+            response.raise_for_status()
+        data = response.json()
+        _record(endpoint, payload, data)
+        return data
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        record_request(endpoint, _model(payload), time.perf_counter() - started, len(args['content']),
+                       len(response.content) if response is not None else None, error)
+
+
+def post_json(endpoint, payload, raise_for_status=False):
+    return call_with_resilience(endpoint, lambda: _post_once(endpoint, payload, raise_for_status))
+
+
+async def apost_json(endpoint, payload, raise_for_status=False):
+    return await acall_with_resilience(endpoint, lambda: _apost_once(endpoint, payload, raise_for_status))
+
+
+def coalesced_post_json(endpoint, payload, raise_for_status=False):
+    """相同的请求正在进行时不再重复发送，共享其结果"""
+    return singleflight.do(singleflight.flight_key(endpoint, payload),
+                           lambda: post_json(endpoint, payload, raise_for_status), endpoint)
+
+
+async def acoalesced_post_json(endpoint, payload, raise_for_status=False):
+    """coalesced_post_json 的协程版本，同一事件循环内相同的请求共享一个任务"""
+    return await singleflight.ado(singleflight.flight_key(endpoint, payload),
+                                  lambda: apost_json(endpoint, payload, raise_for_status), endpoint)
+
+
+def close():
+    global _sync_client, _sync_pid
+    with _lock:
+        if _sync_client is not None and _sync_pid == os.getpid():
+            _sync_client.close()
+        _sync_client, _sync_pid = None, None
+    for loop, client in list(_async_clients.items()):
+        _async_clients.pop(loop, None)
+        if not client.is_closed and not loop.is_closed():
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            else:
+                loop.run_until_complete(client.aclose())
+
+
+if os.environ.get('TALENT_ENDPOINT_BASE'):
+    configure(base_url=os.environ['TALENT_ENDPOINT_BASE'])